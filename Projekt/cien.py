@@ -0,0 +1,134 @@
+#Obraz czarnej dziury: cień, soczewkowane tło (szachownica na sferze niebieskiej) i cienki dysk.
+#Promienie światła śledzone wstecz od kamery. Z symetrii sferycznej promień zależy tylko od kąta psi
+#między kierunkiem piksela a kierunkiem na czarną dziurę: jedno całkowanie na psi (tablica), a każdy
+#piksel czyta z tablicy i obraca wynik o swój kąt na ekranie chi. Obraz (H,W,3) zapisany przez np.save.
+#Przykład: python cien.py --rozmiar 1024 --procesy 8 --out cien.npy
+import argparse
+import time
+import numpy as np
+
+import metryki
+import wsadowe
+import zdarzenia as zd
+
+def stan_fotonu(psi, r_obs, masa=metryki.masa, C=metryki.C, G=metryki.G):
+    #Foton w płaszczyźnie równikowej z kamery w r_obs (phi = 0) pod kątem psi od kierunku na środek.
+    #Składowe w lokalnej bazie ortonormalnej obserwatora statycznego: -cos psi radialnie, sin psi w phi
+    psi = np.asarray(psi, dtype=float)
+    f = 1 - metryki.promien(masa, C, G) / r_obs
+    zero = np.zeros_like(psi)
+    return np.stack((zero, np.full_like(psi, r_obs), np.full_like(psi, np.pi / 2), zero,
+                     np.full_like(psi, 1 / np.sqrt(f)), -np.cos(psi) * np.sqrt(f) * C, zero,
+                     np.sin(psi) * C / r_obs), axis=1)
+
+class Tablica:
+    #Dla każdego psi: r(phi) na wspólnej siatce phi (NaN za końcem promienia), koniec promienia w phi,
+    #pochłonięty (horyzont) albo kierunek ucieczki alfa - kąt od osi kamery w płaszczyźnie promienia
+    def __init__(self, psi, phi, r, phi_koniec, pochloniety, alfa):
+        self.psi, self.phi, self.r = psi, phi, r
+        self.phi_koniec, self.pochloniety, self.alfa = phi_koniec, pochloniety, alfa
+
+    @classmethod
+    def oblicz(cls, psi_max, liczba, r_obs, obiegi=1.5, procesy=0, paczka=256, h_max=5.0, rtol=1e-9):
+        A = metryki.promien()
+        psi = np.linspace(0, psi_max, liczba)
+        y0 = stan_fotonu(psi, r_obs)
+        zdarzenia = [zd.Horyzont(A, 0.01), zd.Ucieczka(1.5 * r_obs)]
+        opcje = dict(rtol=rtol, atol=1e-10, h_max=h_max, zdarzenia=zdarzenia, co=1, max_krokow=20000)
+        t_koniec = 50 * r_obs   #Parametr afiniczny ~ droga; ucieczka kończy wcześniej
+        if procesy:
+            wynik = wsadowe.calkuj_rownolegle(y0, t_koniec, procesy=procesy, paczka=paczka, **opcje)
+        else:
+            wynik = wsadowe.calkuj(metryki.prawa_strona_schwarzschilda(), y0, t_koniec, **opcje)
+
+        #r(phi) z próbek każdego kroku: phi rośnie wzdłuż promienia (psi > 0)
+        siatka = np.linspace(0, 2 * np.pi * obiegi, 1024)
+        r = np.full((liczba, len(siatka)), np.nan)
+        numery, _, stany = wynik.probki
+        granice = np.searchsorted(numery, np.arange(liczba + 1))
+        for k in range(liczba):
+            s = stany[granice[k]:granice[k + 1]]
+            if len(s) > 1 and s[-1, 3] > 0:
+                r[k] = np.interp(siatka, s[:, 3], s[:, 1], right=np.nan)
+        koniec = wynik.y
+        pochloniety = wynik.zdarzenie == 0
+        #Kierunek ruchu na końcu (daleko, prawie płasko): phi plus kąt prędkości od kierunku radialnego
+        alfa = koniec[:, 3] + np.arctan2(koniec[:, 1] * koniec[:, 7], koniec[:, 5])
+        return cls(psi, siatka, r, koniec[:, 3], pochloniety, alfa)
+
+    def r_w(self, psi, phi):    #r na promieniu psi przy kącie phi - dwuliniowo z tablicy, NaN poza nią
+        p = np.clip(psi / self.psi[-1] * (len(self.psi) - 1), 0, len(self.psi) - 1)
+        q = phi / self.phi[-1] * (len(self.phi) - 1)
+        poza = (q < 0) | (q > len(self.phi) - 1)
+        q = np.clip(q, 0, len(self.phi) - 1)
+        p0 = np.minimum(p.astype(int), len(self.psi) - 2)
+        q0 = np.minimum(q.astype(int), len(self.phi) - 2)
+        dp, dq = p - p0, q - q0
+        r = ((1 - dp) * (1 - dq) * self.r[p0, q0] + dp * (1 - dq) * self.r[p0 + 1, q0]
+             + (1 - dp) * dq * self.r[p0, q0 + 1] + dp * dq * self.r[p0 + 1, q0 + 1])
+        return np.where(poza, np.nan, r)
+
+def renderuj(tablica, rozmiar, pole_widzenia, nachylenie, r_wew, r_zew, krata=np.pi / 12):
+    #Kamera otworkowa patrzy na środek (-z); piksel -> psi (od osi) i chi (kąt na ekranie).
+    #nachylenie - kąt między osią kamery a osią dysku
+    polowa = np.tan(pole_widzenia / 2)
+    x, y = np.meshgrid(np.linspace(-polowa, polowa, rozmiar), np.linspace(polowa, -polowa, rozmiar))
+    psi = np.arctan(np.hypot(x, y))
+    chi = np.arctan2(y, x)
+    k = np.clip(np.rint(psi / tablica.psi[-1] * (len(tablica.psi) - 1)).astype(int), 0, len(tablica.psi) - 1)
+    pochloniety = tablica.pochloniety[k]    #Granica cienia bez mieszania sąsiednich promieni
+    alfa = np.interp(psi, tablica.psi, tablica.alfa)
+    phi_koniec = np.interp(psi, tablica.psi, tablica.phi_koniec)
+
+    #Tło: kierunek ucieczki d = cos(alfa) z + sin(alfa) e(chi), szachownica na sferze obróconej o nachylenie
+    dx, dy, dz = np.sin(alfa) * np.cos(chi), np.sin(alfa) * np.sin(chi), np.cos(alfa)
+    dy, dz = dy * np.cos(nachylenie) - dz * np.sin(nachylenie), dy * np.sin(nachylenie) + dz * np.cos(nachylenie)
+    pole = (np.floor(np.arctan2(dy, dx) / krata) + np.floor(np.arcsin(np.clip(dz, -1, 1)) / krata)) % 2
+    obraz = np.where(pole[..., None] == 0, [0.15, 0.2, 0.45], [0.75, 0.8, 0.9])
+    obraz[pochloniety] = 0.0
+
+    #Dysk: płaszczyzna o normalnej n = (0, sin i, cos i); promień w płaszczyźnie (z, e(chi)) przecina ją
+    #przy tan phi = -cos i / (sin chi sin i), co pi. Liczy się pierwsze przecięcie w [r_wew, r_zew]
+    baza = np.mod(np.arctan2(-np.cos(nachylenie), np.sin(chi) * np.sin(nachylenie)), np.pi)
+    trafiony = np.zeros(psi.shape, dtype=bool)
+    r_dysku = np.full(psi.shape, np.nan)
+    for n in range(int(np.ceil(tablica.phi[-1] / np.pi)) + 1):
+        phi = baza + n * np.pi
+        r = tablica.r_w(psi, phi)
+        nowy = ~trafiony & (phi <= phi_koniec) & (r >= r_wew) & (r <= r_zew)
+        r_dysku[nowy] = r[nowy]
+        trafiony |= nowy
+    jasnosc = (r_wew / r_dysku[trafiony]) ** 1.5
+    obraz[trafiony] = jasnosc[:, None] * np.array([1.0, 0.6, 0.2]) + 0.05
+    return obraz.astype(np.float32)
+
+def main():
+    parser = argparse.ArgumentParser(description='Cień i soczewkowanie czarnej dziury Schwarzschilda')
+    parser.add_argument('--rozmiar', type=int, default=512, help='Obraz rozmiar x rozmiar pikseli')
+    parser.add_argument('--r-obs', type=float, default=500.0, help='Odległość kamery')
+    parser.add_argument('--pole-widzenia', type=float, default=25.0, help='Kąt widzenia [stopnie]')
+    parser.add_argument('--nachylenie', type=float, default=80.0, help='Oś kamery od osi dysku [stopnie]')
+    parser.add_argument('--dysk', type=float, nargs=2, default=[3.0, 10.0], help='Promienie dysku w A')
+    parser.add_argument('--promienie', type=int, default=0, help='Rozmiar tablicy psi (0 - 2 x rozmiar)')
+    parser.add_argument('--procesy', type=int, default=0, help='0 - w tym procesie')
+    parser.add_argument('--out', default='cien.npy')
+    args = parser.parse_args()
+
+    A = metryki.promien()
+    pole_widzenia = np.radians(args.pole_widzenia)
+    psi_max = np.arctan(np.sqrt(2) * np.tan(pole_widzenia / 2))     #Róg obrazu
+    start = time.perf_counter()
+    tablica = Tablica.oblicz(psi_max, args.promienie or 2 * args.rozmiar, args.r_obs, procesy=args.procesy)
+    t_tablicy = time.perf_counter() - start
+    obraz = renderuj(tablica, args.rozmiar, pole_widzenia, np.radians(args.nachylenie),
+                     args.dysk[0] * A, args.dysk[1] * A)
+    np.save(args.out, obraz)
+    #Promień cienia: graniczny parametr zderzenia 3 sqrt(3) M, M = A/2
+    psi_cienia = tablica.psi[tablica.pochloniety].max() if tablica.pochloniety.any() else 0.0
+    b = args.r_obs * np.sin(psi_cienia) / np.sqrt(1 - A / args.r_obs)
+    print(f"Tablica {len(tablica.psi)} promieni: {t_tablicy:.2f} s, obraz {args.rozmiar}x{args.rozmiar}: "
+          f"{time.perf_counter() - start - t_tablicy:.2f} s -> {args.out}")
+    print(f"Parametr zderzenia krawędzi cienia {b:.3f} (teoria {1.5 * np.sqrt(3) * A:.3f})")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,103 @@
+#Metryki, symbole Christoffela i gotowe funkcje numeryczne (z pamięci na dysku, pamiec.py).
+#Moduł bez obliczeń przy imporcie - używany przez projekt.py i procesy robocze wsadowe.py
+import functools
+import numpy as np
+import sympy
+from sympy import diff
+
+import pamiec
+
+#Parametry metryki Schwarzschilda
+masa=10
+C=1
+G=1
+
+wspolrzedne = sympy.symbols('t r theta phi')     #utworzenie tablicy symboli numerycznych
+
+def promien(masa=masa, C=C, G=G):   #Promień Schwarzschilda
+    return 2*G*masa/C/C
+
+def macierz4x4(wartosc):
+    return [[wartosc for i in range(4)] for j in range(4)]
+
+def metrykaSchwarzschilda(masa=masa, C=C, G=G, wspolrzedne=wspolrzedne): #(d tau)^2
+    A = promien(masa, C, G)
+    M = macierz4x4(0)
+    M[0][0]=(1-A/wspolrzedne[1])
+    M[1][1]=-1/(1-A/wspolrzedne[1])/C**2
+    M[2][2]=-wspolrzedne[1]*wspolrzedne[1]/C**2
+    M[3][3]=-wspolrzedne[1]*wspolrzedne[1]*(sympy.sin(wspolrzedne[2]) ** 2)/C**2
+    return M
+
+def metrykaEddingtonaFinkelsteina(masa=masa, C=C, G=G, wspolrzedne=wspolrzedne):
+    #(d tau)^2 we współrzędnych wchodzących (v, r, theta, phi), v = t + r*/C: regularna na horyzoncie r = A,
+    #więc spadająca cząstka przechodzi pod horyzont bez zatrzymania kroku. wspolrzedne[0] pełni rolę v
+    A = promien(masa, C, G)
+    M = macierz4x4(0)
+    M[0][0]=(1-A/wspolrzedne[1])
+    M[0][1]=M[1][0]=-1/C
+    M[2][2]=-wspolrzedne[1]*wspolrzedne[1]/C**2
+    M[3][3]=-wspolrzedne[1]*wspolrzedne[1]*(sympy.sin(wspolrzedne[2]) ** 2)/C**2
+    return M
+
+def metrykaMinkowskiego(): #(d tau)^2
+    M = macierz4x4(0)
+    M[0][0]=1
+    M[1][1]=-1
+    M[2][2]=-1
+    M[3][3]=-1
+    return M
+
+def macierzOdwrotna(macierz):  #dla macierzy diagonalnej wprost, w innym przypadku przez sympy
+    if any(macierz[i][j] != 0 for i in range(4) for j in range(4) if i != j):
+        return sympy.simplify(sympy.Matrix(macierz).inv()).tolist()
+    m = macierz4x4(0)
+    for i in range(4):
+        m[i][i] = 1/macierz[i][i]
+    return m
+
+def OblSymChristoffela(metryka,metrykaOdwrotna,wspolrzedne):
+    ch=[macierz4x4(0) for i in range(4)]
+    for a in range(len(wspolrzedne)):
+        for i in range(len(wspolrzedne)):
+            for j in range(len(wspolrzedne)):
+                for k in range(len(wspolrzedne)):
+                    ch[a][i][j]=ch[a][i][j]+0.5*(metrykaOdwrotna[a][k])*((diff(metryka[j][k],wspolrzedne[i]))+(diff(metryka[i][k],wspolrzedne[j]))-(diff(metryka[i][j],wspolrzedne[k])))
+    return ch
+
+def christoffel(M, parametry, wspolrzedne=wspolrzedne):    #Wpis pamięci dla metryki M
+    return pamiec.christoffel(M, wspolrzedne, parametry,
+                              lambda: OblSymChristoffela(M, macierzOdwrotna(M), wspolrzedne))
+
+@functools.lru_cache(maxsize=None)
+def schwarzschild(masa=masa, C=C, G=G):     #Raz na proces i zestaw parametrów
+    return christoffel(metrykaSchwarzschilda(masa, C, G), dict(masa=masa, C=C, G=G))
+
+@functools.lru_cache(maxsize=None)
+def eddington_finkelstein(masa=masa, C=C, G=G):
+    return christoffel(metrykaEddingtonaFinkelsteina(masa, C, G), dict(masa=masa, C=C, G=G, uklad='EF'))
+
+def prawa_strona_eddingtona_finkelsteina(masa=masa, C=C, G=G):
+    return eddington_finkelstein(masa, C, G).prawa_strona
+
+def do_eddingtona_finkelsteina(y, masa=masa, C=C, G=G):
+    #Stan (...,8) ze współrzędnych Schwarzschilda: v = t + (r + A ln|r/A - 1|)/C, dv = dt + dr/(C f)
+    A = promien(masa, C, G)
+    y = np.array(y, dtype=float)
+    r, f = y[..., 1], 1 - A / y[..., 1]
+    y[..., 0] += (r + A * np.log(np.abs(r / A - 1))) / C
+    y[..., 4] += y[..., 5] / (C * f)
+    return y
+
+def z_eddingtona_finkelsteina(y, masa=masa, C=C, G=G):     #Odwrotnie; poza r = A
+    A = promien(masa, C, G)
+    y = np.array(y, dtype=float)
+    r, f = y[..., 1], 1 - A / y[..., 1]
+    y[..., 0] -= (r + A * np.log(np.abs(r / A - 1))) / C
+    y[..., 4] -= y[..., 5] / (C * f)
+    return y
+
+def prawa_strona_schwarzschilda(masa=masa, C=C, G=G):
+    #Funkcja prawej strony dla procesów roboczych: przekazuje się tę funkcję (z parametrami), a nie
+    #wygenerowany kod, którego nie da się przesłać między procesami
+    return schwarzschild(masa, C, G).prawa_strona
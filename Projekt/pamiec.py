@@ -0,0 +1,119 @@
+#Pamięć podręczna symboli Christoffela na dysku: uproszczone wyrażenia (srepr) i wygenerowany kod
+#numeryczny ze wspólnymi podwyrażeniami (CSE). Klucz to skrót metryki, współrzędnych i parametrów
+#(masa, C, G) - zmiana któregokolwiek daje nowy wpis. Kolejne uruchomienie z tą samą metryką
+#tylko wczytuje kod zamiast różniczkować. Katalog: Projekt/.pamiec albo zmienna PROJEKT_PAMIEC.
+#Każdy wpis ma dwie funkcje: christoffel(u) - tablica Γ, prawa_strona(t, y) - całe równanie geodezyjnych
+import hashlib
+import json
+import os
+import sympy
+import numpy as np
+
+WERSJA = 2  #Zmiana formatu lub generatora kodu unieważnia stare wpisy
+katalog = os.environ.get('PROJEKT_PAMIEC', os.path.join(os.path.dirname(os.path.abspath(__file__)), '.pamiec'))
+
+def klucz(metryka, wspolrzedne, parametry=None):   #Skrót sha256 z postaci srepr
+    tekst = json.dumps([WERSJA, sympy.srepr(sympy.Matrix(metryka)), [sympy.srepr(x) for x in wspolrzedne],
+                        sorted((k, repr(v)) for k, v in (parametry or {}).items())])
+    return hashlib.sha256(tekst.encode()).hexdigest()
+
+def zrodlo(symbole, wspolrzedne, nazwa='christoffel'):
+    #Kod funkcji nazwa(u0, u1, ...) -> tablica (n,n,n) (albo (n,n,n,M) dla tablic współrzędnych).
+    #Tylko niezerowe składowe, Γ^a_ij = Γ^a_ji liczone raz, wspólne podwyrażenia wspólne dla wszystkich
+    n = len(wspolrzedne)
+    u = sympy.symbols(f'u0:{n}')
+    zamiana = dict(zip(wspolrzedne, u))
+    skladowe = {(a, i, j): sympy.sympify(symbole[a][i][j]).subs(zamiana)
+                for a in range(n) for i in range(n) for j in range(i, n) if symbole[a][i][j] != 0}
+    pomocnicze, wyrazenia = sympy.cse(list(skladowe.values()), symbols=sympy.numbered_symbols('x'))
+    drukarka = sympy.printing.numpy.NumPyPrinter()
+    linie = [f"def {nazwa}({', '.join(map(str, u))}):"]
+    linie += [f"    {x} = {drukarka.doprint(w)}" for x, w in pomocnicze]
+    linie.append(f"    G = np.zeros(({n}, {n}, {n}) + np.broadcast({', '.join(map(str, u))}).shape)")
+    for (a, i, j), w in zip(skladowe, wyrazenia):
+        cel = f"G[{a}, {i}, {j}]" if i == j else f"G[{a}, {i}, {j}] = G[{a}, {j}, {i}]"
+        linie.append(f"    {cel} = {drukarka.doprint(w)}")
+    linie.append("    return G")
+    return '\n'.join(linie) + '\n'
+
+def zrodlo_prawej_strony(symbole, wspolrzedne, nazwa='prawa_strona'):
+    #Kod funkcji nazwa(t, y) dla solve_ivp: y = (u, v) o kształcie (2n,) albo (2n,M), wynik (du, dv).
+    #dv^a = -Σ Γ^a_ij v^i v^j tylko po niezerowych składowych, i<j raz z czynnikiem 2, bez tablicy Γ
+    n = len(wspolrzedne)
+    u = sympy.symbols(f'u0:{n}')
+    v = sympy.symbols(f'v0:{n}')
+    zamiana = dict(zip(wspolrzedne, u))
+    dv = []
+    for a in range(n):
+        suma = sympy.Integer(0)
+        for i in range(n):
+            for j in range(i, n):
+                if symbole[a][i][j] != 0:
+                    suma += (1 if i == j else 2) * sympy.sympify(symbole[a][i][j]).subs(zamiana) * v[i] * v[j]
+        dv.append(-suma)
+    niezerowe = [a for a in range(n) if dv[a] != 0]
+    pomocnicze, wyrazenia = sympy.cse([dv[a] for a in niezerowe], symbols=sympy.numbered_symbols('x'))
+    drukarka = sympy.printing.numpy.NumPyPrinter()
+    linie = [f"def {nazwa}(t, y):",
+             f"    {', '.join(map(str, u + v))} = y",
+             "    out = np.empty_like(y, dtype=float)",
+             f"    out[:{n}] = y[{n}:]"]
+    linie += [f"    {x} = {drukarka.doprint(w)}" for x, w in pomocnicze]
+    for a in range(n):
+        linie.append(f"    out[{n + a}] = {drukarka.doprint(wyrazenia[niezerowe.index(a)]) if a in niezerowe else 0}")
+    linie.append("    return out")
+    return '\n'.join(linie) + '\n'
+
+def wykonaj(kod, nazwa):    #Funkcja z wygenerowanego kodu
+    przestrzen = {'np': np, 'numpy': np}
+    exec(compile(kod, f'<pamiec:{nazwa}>', 'exec'), przestrzen)
+    return przestrzen[nazwa]
+
+class Christoffel:  #Wpis pamięci: funkcja numeryczna od razu, wyrażenia sympy dopiero na żądanie
+    def __init__(self, klucz, dane, z_pamieci):
+        self.klucz = klucz
+        self.dane = dane
+        self.z_pamieci = z_pamieci
+        self.funkcja = wykonaj(dane['zrodlo'], 'christoffel')
+        self.prawa_strona = wykonaj(dane['zrodlo_prawej_strony'], 'prawa_strona')
+
+    def symbole(self):  #Zagnieżdżone listy [a][i][j] wyrażeń sympy
+        n = len(self.dane['wspolrzedne'])
+        ch = [[[sympy.Integer(0)] * n for _ in range(n)] for _ in range(n)]
+        for (a, i, j), w in self.dane['symbole']:
+            ch[a][i][j] = ch[a][j][i] = sympy.sympify(w)
+        return ch
+
+def sciezka(k):
+    return os.path.join(katalog, k + '.json')
+
+def christoffel(metryka, wspolrzedne, parametry, oblicz, odswiez=False):
+    #oblicz() -> symbole [a][i][j] wołane tylko, gdy wpisu nie ma (albo odswiez=True)
+    k = klucz(metryka, wspolrzedne, parametry)
+    if not odswiez and os.path.exists(sciezka(k)):
+        with open(sciezka(k)) as f:
+            dane = json.load(f)
+        if dane.get('wersja') == WERSJA:
+            return Christoffel(k, dane, True)
+
+    n = len(wspolrzedne)
+    ch = oblicz()
+    ch = [[[sympy.simplify(ch[a][i][j]) for j in range(n)] for i in range(n)] for a in range(n)]
+    dane = dict(wersja=WERSJA, wspolrzedne=[str(x) for x in wspolrzedne],
+                parametry={nazwa: repr(v) for nazwa, v in parametry.items()},
+                metryka=sympy.srepr(sympy.Matrix(metryka)),
+                symbole=[[(a, i, j), sympy.srepr(ch[a][i][j])]
+                         for a in range(n) for i in range(n) for j in range(i, n) if ch[a][i][j] != 0],
+                zrodlo=zrodlo(ch, wspolrzedne), zrodlo_prawej_strony=zrodlo_prawej_strony(ch, wspolrzedne))
+    os.makedirs(katalog, exist_ok=True)
+    tymczasowy = sciezka(k) + f'.{os.getpid()}'     #Zapis przez podmianę pliku - bez połówkowych wpisów
+    with open(tymczasowy, 'w') as f:
+        json.dump(dane, f, indent=1)
+    os.replace(tymczasowy, sciezka(k))
+    return Christoffel(k, dane, False)
+
+def wyczysc():  #Usuwa wszystkie wpisy
+    if os.path.isdir(katalog):
+        for nazwa in os.listdir(katalog):
+            if nazwa.endswith('.json'):
+                os.remove(os.path.join(katalog, nazwa))
@@ -1,90 +1,55 @@
-import sympy
+import time
 import numpy as np
 from scipy.integrate import solve_ivp
-from sympy import lambdify, diff
 
-#Parametry metryki Schwarzschilda
-masa=10
-C=1
-G=1
+from metryki import (masa, C, G, promien, metrykaSchwarzschilda, metrykaEddingtonaFinkelsteina, christoffel,
+                     do_eddingtona_finkelsteina)
+from zdarzenia import Horyzont, Ucieczka, PunktZwrotny
+
 T = 70
+eddington_finkelstein = False   #True - współrzędne (v, r, theta, phi) regularne na horyzoncie
+punkty_wykresu = 2000   #Punkty z wyjścia gęstego do wykresu (zamiast t_eval z T*123+1 punktami)
 
 #Ruch masowej cząstki próbnej 
 initial_value = [0, 30, np.pi/2, 0, 1, 0, 0, 0]
 
-A=2*G*masa/C/C #Parametr pomocniczy
+A=promien(masa, C, G) #Parametr pomocniczy
 print(A, "promień Schwarzschilda")
 
-def macierz4x4(wartosc):
-    return [[wartosc for i in range(4)] for j in range(4)]
-
-def metrykaSchwarzschilda(): #(d tau)^2
-    M = macierz4x4(0)
-    M[0][0]=(1-A/wspolrzedne[1])
-    M[1][1]=-1/(1-A/wspolrzedne[1])/C**2
-    M[2][2]=-wspolrzedne[1]*wspolrzedne[1]/C**2
-    M[3][3]=-wspolrzedne[1]*wspolrzedne[1]*(sympy.sin(wspolrzedne[2]) ** 2)/C**2
-    return M
-
-def metrykaMinkowskiego(): #(d tau)^2
-    M = macierz4x4(0)
-    M[0][0]=1
-    M[1][1]=-1
-    M[2][2]=-1
-    M[3][3]=-1
-    return M
-
-def macierzOdwrotna(macierz):  #dla macierzy diagonalnej
-    m = macierz4x4(0)
-    for i in range(4):
-        m[i][i] = 1/macierz[i][i]
-    return m
-
-def OblSymChristoffela(metryka,metrykaOdwrotna,wspolrzedne): 
-    ch=[macierz4x4(0) for i in range(4)]
-    for a in range(len(wspolrzedne)):
-        for i in range(len(wspolrzedne)):    
-            for j in range(len(wspolrzedne)):
-                for k in range(len(wspolrzedne)):
-                    ch[a][i][j]=ch[a][i][j]+0.5*(metrykaOdwrotna[a][k])*((diff(metryka[j][k],wspolrzedne[i]))+(diff(metryka[i][k],wspolrzedne[j]))-(diff(metryka[i][j],wspolrzedne[k])))
-    return ch                
-
-
-def F(t,tab):   #Funkcja do rozwiązania równania różniczkowego 
-    u = np.array(tab[0:4])
-    v = np.array(tab[4:8])
-
-    chris = func(u[0],u[1], u[2],u[3])
-
-    du = v
-    dv = -np.dot(np.dot(chris, v), v)
-
-    return np.concatenate((du, dv))
-
-
-wspolrzedne = sympy.symbols('t r theta phi')     #utworzenie tablicy symboli numerycznych
-
 #M=metrykaMinkowskiego()
-M=metrykaSchwarzschilda()
-
-N=macierzOdwrotna(M)
+M=metrykaSchwarzschilda(masa, C, G)
+if eddington_finkelstein:
+    M=metrykaEddingtonaFinkelsteina(masa, C, G)
+    initial_value = do_eddingtona_finkelsteina(initial_value, masa, C, G)
 
-SymboleChristofela=OblSymChristoffela(M,N,wspolrzedne)
+#Symbole Christoffela z pamięci na dysku (pamiec.py); liczone od nowa tylko dla nowej metryki lub parametrów
+start = time.perf_counter()
+wpis = christoffel(M, dict(masa=masa, C=C, G=G, uklad='EF') if eddington_finkelstein else dict(masa=masa, C=C, G=G))
+print(f"Symbole Christoffela {'z pamięci' if wpis.z_pamieci else 'obliczone'}: {(time.perf_counter() - start)*1000:.0f} ms")
 
-func = sympy.lambdify((wspolrzedne[0], wspolrzedne[1], wspolrzedne[2],wspolrzedne[3]), SymboleChristofela,("numpy"))
+#Funkcja do rozwiązania równania różniczkowego: wygenerowana, tylko niezerowe składowe Γ i symetria i<->j,
+#także dla wielu stanów naraz (y o kształcie (8,M))
+F = wpis.prawa_strona
 
-t_eval = np.linspace(0, T, int(T * 123 + 1))
+#Koniec przy horyzoncie (w E-F dopiero pod nim) albo ucieczce zamiast całkowania zawsze do T
+zdarzenia = [Horyzont(A, -0.9 if eddington_finkelstein else 0.05), Ucieczka(100 * initial_value[1]),
+             PunktZwrotny(prawa_strona=F)]
 
 # rozwiązanie równania geodezyjnych
-sol = solve_ivp(F, [0, T], initial_value, t_eval=t_eval)
+sol = solve_ivp(F, [0, T], initial_value, events=zdarzenia, dense_output=True)
+for z, t_z in zip(zdarzenia, sol.t_events):
+    if len(t_z):
+        print(f"{z.nazwa}: {len(t_z)} razy, pierwszy w tau = {t_z[0]:.3f}")
+print(f"Koniec w tau = {sol.t[-1]:.3f}, {sol.nfev} wywołań prawej strony")
+wykres = sol.sol(np.linspace(0, sol.t[-1], punkty_wykresu))
 
 
 import matplotlib.pyplot as plt
 plt.figure(figsize=(14, 6),)
-plt.plot(sol.y[0], sol.y[1])
+plt.plot(wykres[0], wykres[1])
 ax = plt.gca()
 plt.grid()
-plt.xlabel('t')
+plt.xlabel('v' if eddington_finkelstein else 't')
 plt.ylabel('r')
 
 plt.show()
@@ -0,0 +1,295 @@
+#Całkowanie wielu geodezyjnych naraz: stan (M,8), jedno wywołanie prawej strony na etap dla wszystkich
+#aktywnych trajektorii. Dormand-Prince 5(4) z osobnym krokiem każdej trajektorii albo stały krok;
+#zakończone trajektorie wypadają z tablic. Tryb równoległy: paczki trajektorii w puli procesów.
+#Przykład: python wsadowe.py --liczba 10000 --procesy 8
+import argparse
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+
+import metryki
+import zdarzenia as zd
+
+#Tablica Butchera Dormanda-Prince'a 5(4)
+C_DP = np.array([0, 1/5, 3/10, 4/5, 8/9, 1, 1])
+A_DP = [[],
+        [1/5],
+        [3/40, 9/40],
+        [44/45, -56/15, 32/9],
+        [19372/6561, -25360/2187, 64448/6561, -212/729],
+        [9017/3168, -355/33, 46732/5247, 49/176, -5103/18656],
+        [35/384, 0, 500/1113, 125/192, -2187/6784, 11/84]]
+B_DP = np.array([35/384, 0, 500/1113, 125/192, -2187/6784, 11/84, 0])
+E_DP = B_DP - np.array([5179/57600, 0, 7571/16695, 393/640, -92097/339200, 187/2100, 1/40])    #Błąd 5. - 4. rząd
+
+#Współczynniki interpolacji (wyjście gęste 4. rzędu) - jak RK45 w scipy:
+#y(t + theta h) = y + h * sum_s k_s * sum_j P[s, j] theta^(j+1)
+P_DP = np.array([[1, -8048581381/2820520608, 8663915743/2820520608, -12715105075/11282082432],
+                 [0, 0, 0, 0],
+                 [0, 131558114200/32700410799, -68118460800/10900136933, 87487479700/32700410799],
+                 [0, -1754552775/470086768, 14199869525/1410260304, -10690763975/1880347072],
+                 [0, 127303824393/49829197408, -318862633887/49829197408, 701980252875/199316789632],
+                 [0, -282668133/205662961, 2019193451/616988883, -1453857185/822651844],
+                 [0, 40617522/29380423, -110615467/29380423, 69997945/29380423]])
+
+#Stan trajektorii po całkowaniu
+DZIALA, KONIEC, BLAD, LIMIT, ZDARZENIE = 0, 1, 2, 3, 4  #w trakcie, doszła do t_koniec, NaN/inf lub krok za
+                                                        #mały, limit kroków, zdarzenie kończące (zdarzenia.py)
+
+class Wynik:
+    def __init__(self, y, t, status, kroki, odrzucone, zdarzenie=None, liczniki=None, zdarzenia=None,
+                 zapis=None, probki=None):
+        self.y = y  #(M,8) stan końcowy
+        self.t = t  #(M,) czas końcowy
+        self.status = status
+        self.kroki = kroki  #Przyjęte kroki każdej trajektorii
+        self.odrzucone = odrzucone
+        self.zdarzenie = zdarzenie  #(M,) numer zdarzenia kończącego albo -1
+        self.liczniki = liczniki    #(M,E) ile razy zaszło każde zdarzenie
+        self.zdarzenia = zdarzenia  #Dla każdego zdarzenia (numery trajektorii, t, y) wszystkich wystąpień
+        self.zapis = zapis  #(M,K,8) stany w chwilach t_zapisu (NaN po końcu trajektorii)
+        self.probki = probki    #(numery trajektorii, t, y) co co przyjętych kroków
+
+    def __len__(self):
+        return len(self.t)
+
+    @staticmethod
+    def polacz(wyniki):     #Sklejenie wyników kolejnych paczek trajektorii
+        przesuniecia = np.cumsum([0] + [len(w) for w in wyniki[:-1]])
+        def rekordy(lista):
+            if lista[0] is None:
+                return None
+            return (np.concatenate([r[0] + p for r, p in zip(lista, przesuniecia)]),
+                    np.concatenate([r[1] for r in lista]), np.concatenate([r[2] for r in lista]))
+        pola = [np.concatenate([getattr(w, pole) for w in wyniki])
+                for pole in ('y', 't', 'status', 'kroki', 'odrzucone', 'zdarzenie', 'liczniki')]
+        zdarzenia = [rekordy([w.zdarzenia[e] for w in wyniki]) for e in range(len(wyniki[0].zdarzenia))]
+        zapis = None if wyniki[0].zapis is None else np.concatenate([w.zapis for w in wyniki])
+        return Wynik(*pola, zdarzenia, zapis, rekordy([w.probki for w in wyniki]))
+
+def etapy(F, t, y, h, k1):     #k1..k7 dla (8,m); k7 to F w nowym punkcie (FSAL)
+    k = [k1]
+    for s in range(1, 7):
+        ys = y + h * sum(a * ki for a, ki in zip(A_DP[s], k) if a)
+        k.append(F(t + C_DP[s] * h, ys))
+    return ys, k    #ys dla s=6 to rozwiązanie 5. rzędu (wiersz A równy B)
+
+def interpoluj(y, Q, theta):    #Wyjście gęste: y (8,p), Q (8,p,4), theta (p,) w [0, 1]
+    return y + np.einsum('ipj,jp->ip', Q, theta ** np.arange(1, 5)[:, None])
+
+def znajdz_zero(zdarzenie, t, y, h, Q, g0, iteracje=50):
+    #Bisekcja po theta na wyjściu gęstym kroku: g(t + theta h) zmienia znak względem g0
+    lewo, prawo = np.zeros(len(t)), np.ones(len(t))
+    for _ in range(iteracje):
+        theta = (lewo + prawo) / 2
+        g = zdarzenie(t + theta * h, interpoluj(y, Q, theta))
+        ten_sam = np.sign(g) == np.sign(g0)
+        lewo, prawo = np.where(ten_sam, theta, lewo), np.where(ten_sam, prawo, theta)
+    return prawo
+
+def calkuj(F, y0, t_koniec, t0=0.0, rtol=1e-8, atol=1e-10, h0=None, staly_krok=False, max_krokow=100000,
+           h_min=1e-12, h_max=np.inf, zdarzenia=(), t_zapisu=None, co=None):
+    #F(t, y) dla y o kształcie (8,m) - np. prawa_strona z pamiec.py; y0: (M,8).
+    #staly_krok=True - krok h0 bez kontroli błędu; h_max - ogranicza krok, żeby nie przeskoczyć kilku zer
+    #funkcji zdarzenia naraz (jak max_step w solve_ivp). zdarzenia - obiekty z zdarzenia.py (kończące i liczone).
+    #t_zapisu - wspólne chwile wyjścia z interpolacji (zamiast t_eval), co - zapis co tyle przyjętych kroków
+    y = np.array(y0, dtype=float).T.copy()  #Wewnętrznie (8,M): F rozpakowuje y po pierwszej osi
+    m = y.shape[1]
+    t = np.full(m, float(t0))
+    t_koniec = np.broadcast_to(np.asarray(t_koniec, dtype=float), (m,))
+    h = np.full(m, (t_koniec - t0).max() / 100 if h0 is None else h0, dtype=float)
+    status = np.full(m, DZIALA, dtype=np.int8)
+    kroki = np.zeros(m, dtype=np.int64)
+    odrzucone = np.zeros(m, dtype=np.int64)
+    aktywne = np.flatnonzero(t < t_koniec)
+    status[t >= t_koniec] = KONIEC
+    k1 = F(t[aktywne], y[:, aktywne])
+
+    zdarzenia = list(zdarzenia)
+    kierunki = np.array([z.direction for z in zdarzenia])
+    granice = np.array([int(z.terminal) for z in zdarzenia])    #Koniec przy tylu wystąpieniach (0 - nigdy)
+    g = np.array([z(t, y) for z in zdarzenia]).reshape(len(zdarzenia), m)
+    liczniki = np.zeros((m, len(zdarzenia)), dtype=np.int64)
+    zdarzenie = np.full(m, -1, dtype=np.int64)
+    wystapienia = [[] for _ in zdarzenia]
+    zapis = nastepny = None
+    if t_zapisu is not None:
+        t_zapisu = np.asarray(t_zapisu, dtype=float)
+        zapis = np.full((m, len(t_zapisu), y.shape[0]), np.nan)
+        nastepny = np.full(m, np.searchsorted(t_zapisu, t0, side='right'))
+        zapis[:, t_zapisu == t0] = y.T[:, None, :]
+    probki = [] if co else None
+    if co:
+        probki.append((np.arange(m), t.copy(), y.T.copy()))
+
+    while len(aktywne):
+        ta, ya = t[aktywne], y[:, aktywne]
+        ha = np.minimum(np.minimum(h[aktywne], h_max), t_koniec[aktywne] - ta)  #Ostatni krok dokładnie do t_koniec
+        nowe, k = etapy(F, ta, ya, ha, k1)
+        if staly_krok:
+            przyjete = np.ones(len(aktywne), dtype=bool)
+        else:
+            blad = ha * sum(e * ki for e, ki in zip(E_DP, k) if e)
+            skala = atol + rtol * np.maximum(np.abs(ya), np.abs(nowe))
+            norma = np.sqrt(np.mean((blad / skala) ** 2, axis=0))
+            przyjete = norma <= 1
+            #Nowy krok z oszacowania błędu (rząd 5), ograniczony do [0.2, 5] razy obecny
+            h[aktywne] = ha * np.clip(0.9 * np.maximum(norma, 1e-10) ** -0.2, 0.2, 5.0)
+
+        nieskonczone = ~np.all(np.isfinite(nowe), axis=0)
+        przyjete &= ~nieskonczone
+        idx = aktywne[przyjete]
+        p_t, p_y, p_h = ta[przyjete], ya[:, przyjete], ha[przyjete]
+        y[:, idx] = nowe[:, przyjete]
+        t[idx] = p_t + p_h
+        kroki[idx] += 1
+        odrzucone[aktywne[~przyjete]] += 1
+        k1 = np.where(przyjete, k[6], k1)
+
+        Q = None
+        if zdarzenia or zapis is not None:  #Wielomian wyjścia gęstego przyjętych kroków
+            Q = p_h[None, :, None] * np.einsum('sip,sj->ipj', np.array(k)[:, :, przyjete], P_DP)
+        koniec_kroku = np.ones(len(idx))    #theta, przy którym trajektoria się zatrzymuje
+        if zdarzenia:
+            g_nowe = np.array([z(t[idx], y[:, idx]) for z in zdarzenia])
+            g_stare = g[:, idx]
+            trafione = (((g_stare < 0) & (g_nowe >= 0) & (kierunki[:, None] >= 0))
+                        | ((g_stare > 0) & (g_nowe <= 0) & (kierunki[:, None] <= 0)))
+            g[:, idx] = g_nowe
+            if trafione.any():
+                theta = np.full(trafione.shape, np.inf)
+                for e, z in enumerate(zdarzenia):
+                    c = np.flatnonzero(trafione[e])
+                    if len(c):
+                        theta[e, c] = znajdz_zero(z, p_t[c], p_y[:, c], p_h[c], Q[:, c], g_stare[e, c])
+                #Najwcześniejsze kończące; liczą się tylko wystąpienia do chwili zatrzymania
+                konczy = trafione & (granice[:, None] > 0) & (liczniki[idx].T + 1 >= granice[:, None])
+                koniec_kroku = np.minimum(np.where(konczy, theta, np.inf).min(axis=0), 1.0)
+                for e in range(len(zdarzenia)):
+                    c = np.flatnonzero(trafione[e] & (theta[e] <= koniec_kroku))
+                    if len(c):
+                        liczniki[idx[c], e] += 1
+                        wystapienia[e].append((idx[c], p_t[c] + theta[e, c] * p_h[c],
+                                               interpoluj(p_y[:, c], Q[:, c], theta[e, c]).T))
+                stop = np.flatnonzero(konczy.any(axis=0))
+                if len(stop):
+                    y[:, idx[stop]] = interpoluj(p_y[:, stop], Q[:, stop], koniec_kroku[stop])
+                    t[idx[stop]] = p_t[stop] + koniec_kroku[stop] * p_h[stop]
+                    status[idx[stop]] = ZDARZENIE
+                    zdarzenie[idx[stop]] = np.argmin(np.where(konczy, theta, np.inf)[:, stop], axis=0)
+
+        if zapis is not None:   #Chwile wyjścia wewnątrz kroku (do zatrzymania), zwykle najwyżej kilka
+            while True:
+                j = nastepny[idx]
+                c = np.flatnonzero(j < len(t_zapisu))
+                c = c[t_zapisu[j[c]] <= p_t[c] + koniec_kroku[c] * p_h[c]]
+                if len(c) == 0:
+                    break
+                zapis[idx[c], j[c]] = interpoluj(p_y[:, c], Q[:, c], (t_zapisu[j[c]] - p_t[c]) / p_h[c]).T
+                nastepny[idx[c]] += 1
+
+        #Trajektorie, które kończą: koniec czasu, błąd, zbyt mały krok, limit kroków
+        status[aktywne[nieskonczone | (h[aktywne] < h_min)]] = BLAD
+        status[idx[(status[idx] == DZIALA) & (t[idx] >= t_koniec[idx])]] = KONIEC
+        status[aktywne[(status[aktywne] == DZIALA) & (kroki[aktywne] + odrzucone[aktywne] >= max_krokow)]] = LIMIT
+        if co:
+            c = idx[(kroki[idx] % co == 0) | (status[idx] != DZIALA)]
+            probki.append((c, t[c], y[:, c].T))
+        dalej = status[aktywne] == DZIALA
+        aktywne, k1 = aktywne[dalej], k1[:, dalej]
+
+    def rekordy(lista):     #(numery trajektorii, t, y) posortowane po trajektorii i czasie
+        if not lista:
+            return np.empty(0, dtype=np.int64), np.empty(0), np.empty((0, y.shape[0]))
+        n, tt, yy = (np.concatenate(x) for x in zip(*lista))
+        kolejnosc = np.lexsort((tt, n))
+        return n[kolejnosc], tt[kolejnosc], yy[kolejnosc]
+    return Wynik(y.T.copy(), t, status, kroki, odrzucone, zdarzenie, liczniki, [rekordy(w) for w in wystapienia],
+                 zapis, rekordy(probki) if co else None)
+
+_prawe_strony = {}  #Prawa strona w procesie roboczym, raz na zestaw parametrów
+
+def _paczka(fabryka, parametry, y0, t_koniec, opcje):
+    klucz = (fabryka.__module__, fabryka.__name__, tuple(sorted(parametry.items())))
+    if klucz not in _prawe_strony:
+        _prawe_strony[klucz] = fabryka(**parametry)
+    return calkuj(_prawe_strony[klucz], y0, t_koniec, **opcje)
+
+def calkuj_rownolegle(y0, t_koniec, fabryka=metryki.prawa_strona_schwarzschilda, parametry=None, procesy=None,
+                      paczka=2048, **opcje):
+    #Paczki po paczka trajektorii w procesach; fabryka(**parametry) -> F w każdym procesie
+    #(wygenerowanego kodu nie da się przesłać, ale fabrykę tak). Wyniki sklejone w kolejności y0
+    y0 = np.asarray(y0, dtype=float)
+    m = len(y0)
+    t_koniec = np.broadcast_to(np.asarray(t_koniec, dtype=float), (m,))
+    granice = list(range(0, m, paczka)) + [m]
+    with ProcessPoolExecutor(procesy or os.cpu_count()) as pula:
+        wyniki = list(pula.map(_paczka, [fabryka] * (len(granice) - 1), [parametry or {}] * (len(granice) - 1),
+                               [y0[a:b] for a, b in zip(granice, granice[1:])],
+                               [t_koniec[a:b] for a, b in zip(granice, granice[1:])],
+                               [opcje] * (len(granice) - 1)))
+    return Wynik.polacz(wyniki)
+
+def stan_poczatkowy(r, predkosc_r, predkosc_phi, masa=metryki.masa, C=metryki.C, G=metryki.G):
+    #Cząstka masowa w płaszczyźnie równikowej: (M,8) z dt/dtau z warunku normalizacji g(u,u) = 1
+    r, predkosc_r, predkosc_phi = np.broadcast_arrays(*(np.asarray(x, dtype=float) for x in (r, predkosc_r, predkosc_phi)))
+    A = metryki.promien(masa, C, G)
+    f = 1 - A / r
+    dt = np.sqrt((1 + predkosc_r ** 2 / f / C ** 2 + r ** 2 * predkosc_phi ** 2 / C ** 2) / f)
+    zero = np.zeros_like(r)
+    return np.stack((zero, r, np.full_like(r, np.pi / 2), zero, dt, predkosc_r, zero, predkosc_phi), axis=1)
+
+def main():
+    parser = argparse.ArgumentParser(description='Wiele geodezyjnych Schwarzschilda naraz')
+    parser.add_argument('--liczba', type=int, default=10000, help='Liczba trajektorii (skan momentu pędu)')
+    parser.add_argument('--r0', type=float, default=60.0)
+    parser.add_argument('--T', type=float, default=2000.0, help='Czas własny końca')
+    parser.add_argument('--procesy', type=int, default=0, help='0 - w tym procesie')
+    parser.add_argument('--paczka', type=int, default=2048)
+    parser.add_argument('--rtol', type=float, default=1e-8)
+    parser.add_argument('--porownaj', type=int, default=20, help='Tyle trajektorii także przez solve_ivp')
+    parser.add_argument('--zdarzenia', action='store_true', help='Koniec na horyzoncie i przy ucieczce (10 r0)')
+    parser.add_argument('--ef', action='store_true', help='Współrzędne Eddingtona-Finkelsteina (przejście horyzontu)')
+    args = parser.parse_args()
+
+    #Skan prędkości kątowej na orbicie kołowej i wokół niej: spadające, związane, uciekające
+    A = metryki.promien()
+    kolowa = np.sqrt(A / 2 / (args.r0 ** 3 - 1.5 * A * args.r0 ** 2))
+    y0 = stan_poczatkowy(args.r0, 0.0, np.linspace(0.3, 1.6, args.liczba) * kolowa)
+    fabryka = metryki.prawa_strona_schwarzschilda
+    if args.ef:     #Horyzont nie jest tu osobliwy - zatrzymanie dopiero przy r = 0.1 A
+        y0 = metryki.do_eddingtona_finkelsteina(y0)
+        fabryka = metryki.prawa_strona_eddingtona_finkelsteina
+    F = fabryka()
+    zdarzenia = []
+    if args.zdarzenia:
+        zdarzenia = [zd.Horyzont(A, -0.9 if args.ef else 0.05), zd.Ucieczka(10 * args.r0)]
+
+    start = time.perf_counter()
+    if args.procesy:
+        wynik = calkuj_rownolegle(y0, args.T, fabryka, procesy=args.procesy, paczka=args.paczka, rtol=args.rtol,
+                                  zdarzenia=zdarzenia)
+    else:
+        wynik = calkuj(F, y0, args.T, rtol=args.rtol, zdarzenia=zdarzenia)
+    czas = time.perf_counter() - start
+    print(f"{args.liczba} trajektorii: {czas:.2f} s, {czas / args.liczba * 1000:.3f} ms na trajektorię, "
+          f"kroki: mediana {np.median(wynik.kroki):.0f}, odrzucone {wynik.odrzucone.sum()}")
+    for nazwa, kod in (('do końca', KONIEC), ('błąd / osobliwość', BLAD), ('limit kroków', LIMIT)):
+        print(f"  {nazwa}: {np.count_nonzero(wynik.status == kod)}")
+    for e, z in enumerate(zdarzenia):
+        print(f"  {z.nazwa}: {np.count_nonzero(wynik.zdarzenie == e)}")
+
+    if args.porownaj:   #Te same warunki przez solve_ivp jedna po drugiej
+        from scipy.integrate import solve_ivp
+        wybrane = np.linspace(0, args.liczba - 1, args.porownaj).astype(int)
+        wybrane = wybrane[wynik.status[wybrane] == KONIEC]
+        start = time.perf_counter()
+        roznice = [np.abs(solve_ivp(F, [0, args.T], y0[k], method='DOP853', rtol=1e-11, atol=1e-12).y[:, -1]
+                          - wynik.y[k])[1:4].max() for k in wybrane]
+        czas_ivp = (time.perf_counter() - start) / max(len(wybrane), 1)
+        print(f"solve_ivp: {czas_ivp * 1000:.1f} ms na trajektorię; "
+              f"największa różnica położeń (r, theta, phi): {max(roznice, default=0):.2e}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,77 @@
+#Zdarzenia kończące lub liczone w trakcie całkowania geodezyjnych: funkcja g(t, y), której zero jest
+#zdarzeniem. Działają z solve_ivp (events=) i z wsadowe.calkuj - y o kształcie (8,) albo (8,M).
+#terminal: False - tylko zapis, True - koniec przy pierwszym, liczba n - koniec przy n-tym (jak w scipy).
+#direction: +1 - tylko gdy g rośnie przez zero, -1 - gdy maleje, 0 - oba
+from abc import ABC, abstractmethod
+
+import numpy as np
+
+class Zdarzenie(ABC):
+    terminal = False
+    direction = 0
+    nazwa = 'zdarzenie'
+
+    @abstractmethod
+    def __call__(self, t, y):
+        pass
+
+class Horyzont(Zdarzenie):
+    #Zbliżenie do promienia Schwarzschilda A na (1 + margines) A - przed osobliwością współrzędnych
+    #zwykłych współrzędnych; w Eddingtonie-Finkelsteinie można dać ujemny margines (pod horyzontem)
+    terminal = True
+    direction = -1
+    nazwa = 'horyzont'
+
+    def __init__(self, A, margines=0.05):
+        self.r = A * (1 + margines)
+
+    def __call__(self, t, y):
+        return y[1] - self.r
+
+class Ucieczka(Zdarzenie):    #Przekroczenie promienia r_max na zewnątrz
+    terminal = True
+    direction = 1
+    nazwa = 'ucieczka'
+
+    def __init__(self, r_max):
+        self.r = r_max
+
+    def __call__(self, t, y):
+        return y[1] - self.r
+
+class PunktZwrotny(Zdarzenie):
+    #dr/dtau = 0: kierunek -1 - apocentrum (r największe), +1 - perycentrum, 0 - oba.
+    #prawa_strona - przy dr/dtau równym dokładnie zero (start z prędkością styczną) znak z przyspieszenia
+    #radialnego, czyli taki jak tuż po starcie; bez tego solve_ivp zgłasza punkt zwrotny w chwili startu
+    nazwa = 'punkt zwrotny'
+
+    def __init__(self, kierunek=0, terminal=False, prawa_strona=None):
+        self.direction = kierunek
+        self.terminal = terminal
+        self.prawa_strona = prawa_strona
+
+    def __call__(self, t, y):
+        g = y[5]
+        if self.prawa_strona is not None and np.any(g == 0):
+            g = np.where(g == 0, self.prawa_strona(t, y)[5], g)
+        return g
+
+class Obieg(Zdarzenie):
+    #n pełnych obiegów w phi od phi0. Funkcja |phi - phi0| - 2 pi n rośnie monotonicznie, więc duży krok
+    #(np. orbita kołowa, gdzie rozwiązanie jest prawie liniowe) nie przeskoczy zera jak przy funkcji okresowej
+    terminal = True
+    direction = 1
+    nazwa = 'obieg'
+
+    def __init__(self, n=1, phi0=0.0):
+        self.n = n
+        self.phi0 = phi0
+
+    def __call__(self, t, y):
+        return np.abs(y[3] - self.phi0) - 2 * np.pi * self.n
+
+def standardowe(A, r_max, obiegi=None):     #Horyzont, ucieczka, punkty zwrotne i opcjonalnie koniec po obiegach
+    zdarzenia = [Horyzont(A), Ucieczka(r_max), PunktZwrotny()]
+    if obiegi:
+        zdarzenia.append(Obieg(obiegi))
+    return zdarzenia
@@ -1,116 +1,112 @@
+import argparse
 import pygame
 import numpy as np
+import os
 import sys
-import random
 
-dt= 0.1    #Krok czasowy (60 klatek na sekundę)
-balls = [] # Lista piłek w symulacji
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje import dyski
+from symulacje.brzegi import Walls
+from symulacje.dyski import Discs
+from symulacje.petla import FixedStepLoop
+from symulacje.profil import profiler
+from symulacje.zapis import TrajectoryRecorder, TrajectoryReader, Replay
+
+dt= 0.1    #Krok czasowy fizyki
+fps = 60    #Klatki na sekundę; czas symulacji płynie jak dawniej: dt na klatkę
+substeps = 1    #Podkroki fizyki w jednym kroku dt
 x_resolution = 1000
 y_resolution = 500
 gravity_vector = np.array([0, 10])
 energy_conservation = 1 #Straty energii przy odbijaniu
 air_resistance=0.005    #Opory powietrza
-
-pygame.init()
-window = pygame.display.set_mode((x_resolution, y_resolution))
-
-class Ball:
-    def __init__(self):
-        self.pos = np.array([x_resolution / 2, y_resolution / 2]) #Położenie
-        self.v = np.array([50.0, 0.0])   #Prędkość
-        self.r = 10
-
-    def simulate(self): # Główna funkcja symulująca piłkę
-        self.apply_gravity()
-        self.move()
-        self.check_for_bounce()
-
-    def move(self):
-        self.pos += self.v*dt
-        self.v *=(1-air_resistance)
-
-    def apply_gravity(self):
-        self.v += gravity_vector*dt
-
-    def check_for_bounce(self):
-        # Sprawdzamy czy piłka zderzyła się z krawędziami ekranu 
-        if self.pos[0] < 0 + self.r:
-            self.pos[0]= 0 + self.r
-            self.v[0] *= -energy_conservation
-        elif x_resolution - self.r < self.pos[0]:
-            self.v[0] *= -energy_conservation
-            self.pos[0]= x_resolution - self.r
-
-        if self.pos[1] < 0 + self.r:
-            self.pos[1]= 0 + self.r
-            self.v[1] *= -energy_conservation
-        elif y_resolution - self.r < self.pos[1]:
-            self.v[1] *= -energy_conservation
-            self.pos[1]= y_resolution - self.r
-
-def collision(b1, b2):
-    delta_pos = b2.pos - b1.pos #wektor między środkami piłek
-    dist = np.linalg.norm(delta_pos)    #odległość między środkami piłek
-    if dist > b1.r + b2.r: #brak kolizji
-        return  
-
-    n = delta_pos / dist    #wektor normalny 
-    t = np.array([-n[1], n[0]]) #wektor styczny
-
-    #Rzutowanie prędkości piłek na wektory n i t
-    v1n = np.dot(b1.v, n)
-    v1t = np.dot(b1.v, t)
-    v2n = np.dot(b2.v, n)
-    v2t = np.dot(b2.v, t)
-
-    #Wymiana pędu, zakładam równe masy piłek
-    b1.v = v2n * n + v1t * t
-    b2.v = v1n * n + v2t * t
-
-    #Zmiana położenia (by piłki nie przenikały się)
-    correction = (b1.r + b2.r - dist) / 2 * n
-    b1.pos -= correction
-    b2.pos += correction
-
-# Tworzę piłki
-for i in range(11):
-    balls.append(Ball())
-    balls[i].pos[0] = random.randint(1, x_resolution)
-    balls[i].pos[1] = random.randint(1, y_resolution)
-
-# Zaczynam symulację
-run_simulation = True
-while run_simulation:
-    window.fill((255, 255, 255))    #Okno koloru białego
-    for ball in balls:
-        ball.simulate()
-
-        for i in range(len(balls)):
-            for j in range(i + 1, len(balls)):
-                collision(balls[i], balls[j])
-
-        pygame.draw.circle(window, (0, 0, 255), [int(ball.pos[0]), int(ball.pos[1])] , ball.r)
-
-    pygame.display.flip()   #Odświeżenie ekranu
-    pygame.time.Clock().tick(60)    #Ograniczenie liczby klatek na sekundę
-
-    for e in pygame.event.get():
-
-        if e.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
-
-        elif e.type == pygame.MOUSEBUTTONDOWN:
-            mouse_pos = np.array(pygame.mouse.get_pos())
-            for ball in balls:
-                if np.linalg.norm(ball.pos - mouse_pos) <= ball.r:
-                    direction = ball.pos - mouse_pos    #wektor do środka piłki od miejsca kliknięcia
-                    if np.linalg.norm(direction) != 0:
-                        direction = direction / np.linalg.norm(direction)   #normalizacja wektora
-                    ball.v = direction * 200  # nadaje prędkość po kliknięciu
-
-
-
-
-
-    
+ball_count = 11 #Liczba piłek w symulacji
+ball_radius = 10
+push_speed = 200    #Prędkość piłki po kliknięciu
+
+class Scene:    #Piłki w oknie; krok fizyki działa bez okna
+    def __init__(self, count=ball_count):
+        pos = np.column_stack((np.random.randint(1, x_resolution + 1, count),
+                               np.random.randint(1, y_resolution + 1, count)))
+        v = np.tile([50.0, 0.0], (count, 1))
+        self.balls = Discs(pos, v, ball_radius, m=1.0)  #Zakładam równe masy piłek
+        self.walls = Walls((x_resolution, y_resolution), energy_conservation)
+
+    def step(self, dt):     #Grawitacja, ruch z oporem powietrza, odbicia od ścian i kolizje raz na krok
+        dyski.step(self.balls, dt, gravity_vector, air_resistance, (self.walls,), bounds=self.walls.size)
+
+    def push(self, mouse_pos):  #nadaje prędkość klikniętym piłkom
+        self.balls.push(mouse_pos, push_speed, impulse=False)
+
+    def state(self):
+        return self.balls.pos
+
+    def velocity(self):
+        return self.balls.v
+
+    def radius(self):
+        return self.balls.r
+
+def main():
+    parser = argparse.ArgumentParser(description='Odbijające się piłki')
+    parser.add_argument('--record', help='Zapis przebiegu do pliku')
+    parser.add_argument('--replay', help='Odtworzenie zapisu z pliku bez liczenia fizyki')
+    parser.add_argument('--profile', help='Zapis osi czasu profilera do pliku .csv albo .json (F3 - nakładka)')
+    args = parser.parse_args()
+    profiler.enabled = profiler.enabled or args.profile is not None
+    profiler.keep_timeline = args.profile is not None   #Oś czasu tylko do zapisu, nakładce wystarczy okno
+
+    pygame.init()
+    window = pygame.display.set_mode((x_resolution, y_resolution))
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 20)
+    scene = recorder = None
+    if args.replay:
+        reader = TrajectoryReader(args.replay)
+        replay = Replay(reader)
+        radius = np.asarray(reader.static['radius'])
+        loop = FixedStepLoop(replay.step, reader.meta['dt'], speed=reader.meta['speed'], state=replay.state)
+    else:
+        scene = Scene(ball_count)  # Tworzę piłki
+        radius = scene.radius()
+        on_step = None
+        if args.record:     #Klatka po każdym kroku fizyki
+            shape = scene.state().shape
+            recorder = TrajectoryRecorder(args.record, {'pos': ('f4', shape), 'vel': ('f4', shape)},
+                                          static={'radius': radius}, meta={'dt': dt, 'speed': dt * fps})
+            on_step = lambda loop: recorder.append(loop.time, pos=scene.state(), vel=scene.velocity())
+        loop = FixedStepLoop(scene.step, dt, substeps, speed=dt * fps, state=scene.state, on_step=on_step)
+
+    # Zaczynam symulację
+    run_simulation = True
+    while run_simulation:
+        window.fill((255, 255, 255))    #Okno koloru białego
+        alpha = loop.advance(clock.tick(fps) / 1000)    #Tyle kroków fizyki, ile należy się za czas klatki
+
+        with profiler.section('render'):
+            for (x, y), r in zip(loop.interpolated(alpha).astype(int).tolist(), radius.tolist()):
+                pygame.draw.circle(window, (0, 0, 255), [x, y], r)
+
+        if profiler.enabled:    #Nakładka: p50 / p95 sekcji, średnie liczniki
+            profiler.draw(window, font)
+        pygame.display.flip()   #Odświeżenie ekranu
+        profiler.end_frame()
+
+        for e in pygame.event.get():
+
+            if e.type == pygame.QUIT:
+                if recorder is not None:
+                    recorder.close()
+                if args.profile:
+                    profiler.export(args.profile)
+                pygame.quit()
+                sys.exit()
+
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                profiler.enabled = not profiler.enabled
+
+            elif e.type == pygame.MOUSEBUTTONDOWN and scene is not None:
+                scene.push(np.array(pygame.mouse.get_pos(), dtype=float))
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+#Porównanie koralików opisanych kątem (katowe.py) z ruchem 2D i rzutowaniem na drut (zespol.py, jak koraliki.py):
+#przepustowość i dryf energii dla kilku kroków czasowych. Drut nieruchomy, grawitacja włączona.
+#Uruchomienie: python benchmark_katowy.py --scenes 1024 --beads 6 --dts 0.01 0.05 0.2
+import argparse
+import time
+import numpy as np
+
+from katowe import AngularBeads
+from zespol import Ensemble, gravity_vector, wire_radius
+
+SCHEMES = ('projection', 'angle')
+
+def initial(scenes, beads, seed):   #Koraliki rozstawione równo z losowym obrotem, losowe prędkości styczne
+    rng = np.random.default_rng(seed)
+    angle = np.linspace(0, 2 * np.pi, beads, endpoint=False) + rng.uniform(0, 2 * np.pi, (scenes, 1))
+    radius = rng.uniform(10, 25, (scenes, beads))
+    omega = rng.normal(0, 0.5, (scenes, beads))
+    return angle, radius, omega
+
+def energy(scheme, sim):    #Energia na scenę w układzie drutu
+    if scheme == 'angle':
+        return sim.energy()
+    kinetic = 0.5 * sim.m * (sim.v ** 2).sum(axis=-1)
+    potential = -sim.m * ((sim.pos - sim.center[:, None, :]) @ gravity_vector)
+    return (kinetic + potential).sum(axis=1)
+
+def create(scheme, angle, radius, omega):
+    if scheme == 'angle':
+        sim = AngularBeads(angle, radius)
+        sim.omega[:] = omega
+    else:
+        sim = Ensemble(radius, angle, mode='wire', gravity=True)
+        tangent = np.stack((-np.sin(angle), np.cos(angle)), axis=-1)
+        sim.v[:] = (wire_radius * omega)[..., None] * tangent
+    return sim
+
+def run_case(scheme, dt, duration, angle, radius, omega):
+    sim = create(scheme, angle, radius, omega)
+    e0 = energy(scheme, sim)
+    scale = sim.m.sum(axis=1) * np.linalg.norm(gravity_vector) * wire_radius   #m·g·R sceny
+    steps = int(round(duration / dt))
+    start = time.perf_counter()
+    for _ in range(steps):
+        sim.step(dt)
+    elapsed = time.perf_counter() - start
+    drift = np.abs(energy(scheme, sim) - e0) / scale
+    return dict(scheme=scheme, dt=dt, steps=steps, seconds=elapsed,
+                rate=sim.m.size * steps / elapsed, drift_median=np.median(drift), drift_max=drift.max(),
+                finite=bool(np.isfinite(drift).all()))
+
+def main():
+    parser = argparse.ArgumentParser(description='Koraliki: kąt na drucie kontra rzutowanie 2D')
+    parser.add_argument('--scenes', type=int, default=1024)
+    parser.add_argument('--beads', type=int, default=6)
+    parser.add_argument('--duration', type=float, default=100.0, help='Czas symulacji [s]')
+    parser.add_argument('--dts', type=float, nargs='+', default=[0.01, 0.05, 0.1, 0.2])
+    parser.add_argument('--schemes', nargs='+', choices=SCHEMES, default=list(SCHEMES))
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    angle, radius, omega = initial(args.scenes, args.beads, args.seed)
+    print(f'{"schemat":>10} {"dt":>6} {"kroki":>6} {"mln/s":>7} {"dryf med":>9} {"dryf max":>9}')
+    for dt in args.dts:
+        for scheme in args.schemes:
+            r = run_case(scheme, dt, args.duration, angle, radius, omega)
+            print(f'{r["scheme"]:>10} {r["dt"]:>6g} {r["steps"]:>6} {r["rate"] / 1e6:>7.2f} '
+                  f'{r["drift_median"]:>9.2e} {r["drift_max"]:>9.2e}' + ('' if r['finite'] else '  NIESTABILNY'))
+
+if __name__ == '__main__':
+    main()
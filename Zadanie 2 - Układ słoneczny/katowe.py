@@ -0,0 +1,125 @@
+#Koraliki opisane kątem na drucie zamiast położeniem 2D z rzutowaniem (keep_on_wire).
+#Całkowanie Verletem w układzie drutu, kolizje jako przedziały na okręgu - tylko sąsiedzi na okręgu.
+#Tablice (B,N) jak w zespol.py - B niezależnych scen naraz, jedna scena to B=1
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje.pbd import disjoint_batches
+from symulacje.profil import profiler
+from zespol import dt, x_resolution, y_resolution, gravity_vector, wire_radius
+
+class AngularBeads:
+    #angle, radius, mass: (B,N); wire_velocity: (B,2) prędkość drutu w chwili startu
+    def __init__(self, angle, radius, mass=None, wire_velocity=None):
+        self.theta = np.mod(np.array(angle, dtype=float), 2 * np.pi)
+        self.r = np.array(radius, dtype=float)
+        self.m = np.pi * self.r ** 2 if mass is None else np.array(mass, dtype=float)
+        b, n = self.theta.shape
+        self.omega = np.zeros((b, n))   #Prędkość kątowa względem drutu
+        self.center = np.tile([x_resolution / 2, y_resolution / 2], (b, 1)).astype(float)
+        self.wire_velocity = np.zeros((b, 2)) if wire_velocity is None else np.array(wire_velocity, dtype=float)
+        self.time = 0.0
+        self.accel = self.acceleration()
+        self.batches = self.neighbour_batches(n)
+        self.ring()
+
+    @staticmethod
+    def neighbour_batches(n):   #Pary sąsiednich miejsc na okręgu (k, k+1 mod n) w rozłącznych paczkach
+        if n < 2:
+            return []
+        k = np.arange(n)    #Przy dwóch koralikach to dwa różne styki: 0→1 i przez szew 1→0
+        return [k[batch] for batch in disjoint_batches(k, (k + 1) % n, n)]
+
+    def ring(self):
+        #Koraliki nie mijają się na drucie, więc kolejność na okręgu ustalana jest raz, przy starcie.
+        #Kąty dalej nie są zawijane: łuk od koralika do następnego to theta[next] - theta + turn,
+        #turn = 2π tylko dla ostatniego na okręgu - bez sortowania i modulo w każdym kroku
+        b, n = self.theta.shape
+        self.order = np.argsort(self.theta, axis=1)     #Miejsce na okręgu -> koralik
+        rows = np.arange(b)[:, None]
+        self.next = np.empty_like(self.order)   #Koralik -> następny na okręgu
+        self.next[rows, self.order] = np.roll(self.order, -1, axis=1)
+        self.turn = np.zeros((b, n))
+        self.turn[rows[:, 0], self.order[:, -1]] = 2 * np.pi
+        #Najmniejszy odstęp kątowy sąsiadów: cięciwa 2R sin(φ/2) równa sumie promieni
+        self.reach = 2 * np.arcsin(np.minimum((self.r + np.take_along_axis(self.r, self.next, 1))
+                                              / (2 * wire_radius), 1.0))
+
+    def acceleration(self):     #Przyspieszenie kątowe od grawitacji: g·t / R, t - styczna
+        return (gravity_vector[1] * np.cos(self.theta) - gravity_vector[0] * np.sin(self.theta)) / wire_radius
+
+    def step(self, dt=dt, wire_velocity=None):
+        #Zmiana prędkości drutu to uderzenie: koralik zachowuje prędkość styczną w układzie inercjalnym
+        if wire_velocity is not None:
+            du = np.asarray(wire_velocity, dtype=float) - self.wire_velocity
+            if du.any():
+                self.omega -= (du[:, 1, None] * np.cos(self.theta) - du[:, 0, None] * np.sin(self.theta)) / wire_radius
+                self.accel = self.acceleration()
+                self.wire_velocity = np.broadcast_to(wire_velocity, self.wire_velocity.shape).astype(float)
+
+        #Verlet prędkościowy: jedno sin/cos na koralik na krok, kolizje w połowie kroku
+        with profiler.section('integrate'):
+            self.omega += 0.5 * dt * self.accel
+            self.theta += self.omega * dt
+        with profiler.section('response'):    #Sortowanie na okręgu jest tu całą fazą szeroką
+            self.collide(dt)
+        with profiler.section('integrate'):
+            self.accel = self.acceleration()
+            self.omega += 0.5 * dt * self.accel
+            self.center += self.wire_velocity * dt
+        self.time += dt
+
+    def collide(self, dt=dt):
+        #Po sortowaniu przy starcie kolidować mogą tylko sąsiedzi na okręgu
+        n = self.theta.shape[1]
+        if n < 2:
+            return
+        overlap = self.reach - (np.take_along_axis(self.theta, self.next, 1) - self.theta + self.turn)
+        touching = overlap > 0
+        profiler.count('contacts', np.count_nonzero(touching))
+        rows = np.flatnonzero(touching.any(axis=1))
+        if len(rows) == 0:
+            return
+
+        #Dalej tylko sceny z kontaktem, w kolejności na okręgu
+        order = self.order[rows]
+        ts = np.take_along_axis(self.theta[rows], order, 1)
+        ws = np.take_along_axis(self.omega[rows], order, 1)
+        ms = np.take_along_axis(self.m[rows], order, 1)
+        reach = np.take_along_axis(self.reach[rows], order, 1)
+        turn = np.take_along_axis(self.turn[rows], order, 1)
+        for k in self.batches:
+            l = (k + 1) % n
+            overlap = reach[:, k] - (ts[:, l] - ts[:, k] + turn[:, k])
+            hit = overlap > 0
+            if not hit.any():
+                continue
+            wa, wb, ma, mb = ws[:, k], ws[:, l], ms[:, k], ms[:, l]
+            approach = hit & (wa > wb)  #Zderzenie sprężyste 1D tylko dla zbliżających się
+            new_wa = np.where(approach, ((ma - mb) * wa + 2 * mb * wb) / (ma + mb), wa)
+            new_wb = np.where(approach, ((mb - ma) * wb + 2 * ma * wa) / (ma + mb), wb)
+
+            #Zderzenie w trakcie kroku: od chwili styku koraliki jadą już z nowymi prędkościami.
+            #Stojące na sobie (bez zbliżania) rozsunięte po łuku po połowie, jak w koraliki.py
+            since = np.minimum(overlap / np.where(approach, wa - wb, 1.0), dt)
+            shift = np.where(hit & ~approach, overlap / 2, 0.0)
+            ts[:, k] += np.where(approach, (new_wa - wa) * since, 0.0) - shift
+            ts[:, l] += np.where(approach, (new_wb - wb) * since, 0.0) + shift
+            ws[:, k], ws[:, l] = new_wa, new_wb
+        self.theta[rows[:, None], order] = ts
+        self.omega[rows[:, None], order] = ws
+
+    def positions(self):    #(B,N,2) - tylko do rysowania i zapisu
+        return self.center[:, None, :] + wire_radius * np.stack(
+            (np.cos(self.theta), np.sin(self.theta)), axis=-1)
+
+    def velocities(self):   #Prędkości w układzie inercjalnym
+        tangent = np.stack((-np.sin(self.theta), np.cos(self.theta)), axis=-1)
+        return (wire_radius * self.omega)[..., None] * tangent + self.wire_velocity[:, None, :]
+
+    def energy(self):   #Energia w układzie drutu (stała prędkość drutu) na scenę
+        kinetic = 0.5 * self.m * (wire_radius * self.omega) ** 2
+        potential = -self.m * wire_radius * (gravity_vector[0] * np.cos(self.theta) + gravity_vector[1] * np.sin(self.theta))
+        return (kinetic + potential).sum(axis=1)
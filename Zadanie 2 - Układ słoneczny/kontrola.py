@@ -0,0 +1,55 @@
+#Sprawdzenia scen z koralikami bez okna (koraliki2.py, katowe.py): python kontrola.py
+import argparse
+import random
+import sys
+import numpy as np
+
+from katowe import AngularBeads
+from koraliki2 import Scene, dt
+
+def check_center_push(steps, seed):
+    #Kliknięcie w centralną kulkę i w koralik - środek drutu ma zostać w miejscu
+    random.seed(seed)   #Promienie koralików
+    scene = Scene()
+    start = scene.discs.pos[0].copy()
+    scene.push(scene.discs.pos[0] + 3.0)    #Kliknięcie w centralną kulkę obok jej środka
+    scene.push(scene.discs.pos[1] + 1.0)    #i w pierwszy koralik
+    pushed = np.linalg.norm(scene.discs.v[1])
+    for _ in range(steps):
+        scene.step(dt)
+    return pushed, np.linalg.norm(scene.discs.v[0]), np.linalg.norm(scene.discs.pos[0] - start)
+
+def check_seam(step=0.001, duration=0.5):
+    #Dwa koraliki zbliżające się przez θ=0: styk przez szew to osobna para, mają się odbić, nie minąć.
+    #Zwraca najmniejszy łuk między nimi względem odstępu przy styku i prędkości kątowe na końcu
+    beads = AngularBeads([[-0.3, 0.3]], [[15.0, 15.0]])
+    beads.omega[:] = [[1.0, -1.0]]
+    closest = np.inf
+    for _ in range(int(round(duration / step))):
+        beads.step(step)
+        arc = np.mod(beads.theta[0, 1] - beads.theta[0, 0], 2 * np.pi)    #Od pierwszego do drugiego
+        closest = min(closest, arc / beads.reach[0, 0])
+    return closest, beads.omega[0]
+
+def main():
+    parser = argparse.ArgumentParser(description='Sprawdzenia sceny koraliki2 bez okna')
+    parser.add_argument('--steps', type=int, default=2000)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=1.0, help='Dopuszczalne przesunięcie środka [px]')
+    args = parser.parse_args()
+
+    pushed, speed, drift = check_center_push(args.steps, args.seed)
+    ok = pushed > 0 and speed == 0 and drift <= args.tolerance
+    print(f"pchnięcie przy środku: prędkość koralika {pushed:.1f}, prędkość środka {speed:.2e}, "
+          f"przesunięcie środka po {args.steps} krokach {drift:.2e} px {'OK' if ok else 'BŁĄD'}")
+    failed = not ok
+
+    closest, omega = check_seam()
+    ok = closest > 0.9 and omega[0] < 0 < omega[1]  #Odbite: zawrócone, łuk nie spadł poniżej styku
+    print(f"dwa koraliki przez szew: najmniejszy łuk {closest:.3f} odstępu styku, "
+          f"prędkości po {omega[0]:+.2f} {omega[1]:+.2f} {'OK' if ok else 'BŁĄD'}")
+    failed |= not ok
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -1,131 +1,121 @@
+import argparse
 import pygame
 import numpy as np
+import os
 import sys
 import random
 
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje import dyski
+from symulacje.brzegi import Wire
+from symulacje.dyski import Discs
+from symulacje.petla import FixedStepLoop
+from symulacje.profil import profiler
+from symulacje.zapis import TrajectoryRecorder, TrajectoryReader, Replay
+
 dt= 0.05    #Krok czasowy 
+fps = 60    #Klatki na sekundę; czas symulacji płynie jak dawniej: dt na klatkę
+substeps = 1    #Podkroki fizyki w jednym kroku dt
 x_resolution = 1000
 y_resolution = 500
 gravity_vector = np.array([0, 100])
 num_beads = 6
-beads = []
-
-pygame.init()
-window = pygame.display.set_mode((x_resolution, y_resolution))
 
 #Parametry okręgu na którym będą koralki (drutu)
-wire_center = np.array([x_resolution / 2, y_resolution / 2], dtype=float)
 wire_radius = min(x_resolution, y_resolution) * 0.4
-
-prev_wire_center = np.copy(wire_center) #Kopia położenia centrum okręgu
 wire_speed = 30.0  # prędkość ruchu okręgu [px/s]
 
-class Bead:
-    def __init__(self, pos, r):
-        self.pos = np.array(pos, dtype=float)
-        self.prev_pos = np.copy(self.pos)
-        self.v = np.zeros(2)
-        self.r = r
-        self.m = np.pi * r * r     #Masa koralika na podstawie promienia
-
-    def simulate(self, wire_center, wire_velocity):
-        self.apply_gravity()
-        self.move()
-        self.keep_on_wire(wire_center)
-        self.update_velocity(wire_velocity)
-
-    def apply_gravity(self):
-        self.v += gravity_vector * dt
-
-    def move(self):
-        self.prev_pos[:] = self.pos #Aktualizacja zawartości tablicy (kopia w miejsce poprzednich wartości)
-        self.pos += self.v*dt
-
-    def keep_on_wire(self, wire_center):
-        dir_vec = self.pos - wire_center    #wektor od środka okręgu do koralika
-        length = np.linalg.norm(dir_vec)    #odległość koralika od środka
-        dir_vec /= length   #normalizacja
-        correction = wire_radius - length   #
-        self.pos += dir_vec * correction    #przesunięcie koralika na okrąg
-
-    def update_velocity(self, wire_velocity):   #Aktualizacja prędkości koralika uwzględniając ruch poręczy
-        self.v = (self.pos - self.prev_pos) / dt + wire_velocity    #prędkość = prędkość poruszającego się koralika + prękość obręczy
-
-def collision(b1, b2):
-    delta_pos = b2.pos - b1.pos #wektor między środkami piłek
-    dist = np.linalg.norm(delta_pos)    #odległość między środkami piłek
-    if dist == 0 or dist > b1.r + b2.r: #brak kolizji
-        return
-
-    n = delta_pos / dist    #wektor normalny
-    t = np.array([-n[1], n[0]]) #wektor styczny
-
-    #Rzutowanie prędkości piłek na wektory n i t
-    v1n = np.dot(b1.v, n)
-    v1t = np.dot(b1.v, t)
-    v2n = np.dot(b2.v, n)
-    v2t = np.dot(b2.v, t)
-
-    #Składowe normalne prędkości po sprężystym zderzeniu koralików o różnych masach
-    m1 = b1.m
-    m2 = b2.m
-    new_v1n = (m1 * v1n + m2 * v2n - m2 * (v1n - v2n)) / (m1 + m2)
-    new_v2n = (m1 * v1n + m2 * v2n - m1 * (v2n - v1n)) / (m1 + m2)
-
-    #Wymiana pędu
-    b1.v = new_v1n * n + v1t * t
-    b2.v = new_v2n * n + v2t * t
-
-    #Zmiana położenia (by piłki nie przenikały się)
-    correction = (b1.r + b2.r - dist) / 2 * n
-    b1.pos -= correction
-    b2.pos += correction
-
-# --- Tworzenie koralików -------------------------------------------------
-angle = 0.0
-for _ in range(num_beads):
-    r = random.uniform(10, 25)  #Losuje promień koralika z przedziału 10-25
-    pos = wire_center + wire_radius * np.array([np.cos(angle), np.sin(angle)]) #Pozycja koralika na okręgu na podstawie kąta
-    beads.append(Bead(pos, r))  
-    angle += np.pi / num_beads #Zwiększenie kąta dla następnego koralika 
-
-# Zaczynam symulację
-run_simulation = True
-while run_simulation:
-    window.fill((255, 255, 255))    #Okno koloru białego
- 
-    prev_wire_center[:] = wire_center   #Kopia położenia okręgu
-
-    #Sterowanie okręgiem klawiaturą
-    keys = pygame.key.get_pressed()
-    move = np.zeros(2, dtype=float)
-    if keys[pygame.K_LEFT]:
-        move[0] -= wire_speed * dt
-    if keys[pygame.K_RIGHT]:
-        move[0] += wire_speed * dt
-    if keys[pygame.K_UP]:
-        move[1] -= wire_speed * dt
-    if keys[pygame.K_DOWN]:
-        move[1] += wire_speed * dt
-    wire_center += move
-
-    wire_velocity = (wire_center - prev_wire_center) / dt   #Prędkość obręczy
-
-    pygame.draw.circle(window, (255, 0, 0), wire_center.astype(int), int(wire_radius), width=2)
-
-    for bead in beads:
-        bead.simulate(wire_center, wire_velocity)
-
-    for i in range(len(beads)):
-        for j in range(i + 1, len(beads)):
-            collision(beads[i], beads[j])
-
-    for bead in beads:
-        pygame.draw.circle(window, (0, 0, 255), bead.pos.astype(int), int(bead.r))
-
-    pygame.display.flip()   #Odświeżenie ekranu
-    pygame.time.Clock().tick(60)    #Ograniczenie liczby klatek na sekundę
-    for e in pygame.event.get():
-        if e.type == pygame.QUIT:
-            pygame.quit()
-            sys.exit()
+class Scene:    #Drut z koralikami; krok fizyki działa bez okna
+    def __init__(self, num_beads=num_beads):
+        self.wire = Wire([x_resolution / 2, y_resolution / 2], wire_radius)
+        self.wire_direction = np.zeros(2)   #Sterowanie okręgiem (-1, 0, 1 w każdej osi)
+
+        # --- Tworzenie koralików -------------------------------------------------
+        angle = np.pi * np.arange(num_beads) / num_beads    #Koraliki na połowie okręgu
+        r = [random.uniform(10, 25) for _ in range(num_beads)]  #Losuje promień koralika z przedziału 10-25
+        pos = self.wire.center + wire_radius * np.column_stack((np.cos(angle), np.sin(angle)))
+        self.beads = Discs(pos, np.zeros_like(pos), r)  #Masa koralika na podstawie promienia
+
+    @property
+    def wire_center(self):
+        return self.wire.center
+
+    def step(self, dt):
+        self.wire.velocity = self.wire_direction * wire_speed  #Prędkość obręczy
+        self.wire.move(dt)
+        #Koraliki rzutowane na drut, prędkość = prędkość poruszającego się koralika + prękość obręczy
+        dyski.step(self.beads, dt, gravity_vector, boundaries=(self.wire,))
+
+    def state(self):    #Środek drutu i koraliki - do interpolacji przy rysowaniu
+        return np.vstack((self.wire.center, self.beads.pos))
+
+    def velocity(self):     #Prędkości w tej samej kolejności co state()
+        return np.vstack((self.wire.velocity, self.beads.v))
+
+    def radius(self):
+        return np.concatenate(([wire_radius], self.beads.r))
+
+def main():
+    parser = argparse.ArgumentParser(description='Koraliki na poruszanym drucie')
+    parser.add_argument('--record', help='Zapis przebiegu do pliku')
+    parser.add_argument('--replay', help='Odtworzenie zapisu z pliku bez liczenia fizyki')
+    parser.add_argument('--profile', help='Zapis osi czasu profilera do pliku .csv albo .json (F3 - nakładka)')
+    args = parser.parse_args()
+    profiler.enabled = profiler.enabled or args.profile is not None
+    profiler.keep_timeline = args.profile is not None   #Oś czasu tylko do zapisu, nakładce wystarczy okno
+
+    pygame.init()
+    window = pygame.display.set_mode((x_resolution, y_resolution))
+    clock = pygame.time.Clock()
+    font = pygame.font.SysFont(None, 20)
+    scene = recorder = None
+    if args.replay:
+        reader = TrajectoryReader(args.replay)
+        replay = Replay(reader)
+        radius = np.asarray(reader.static['radius'])
+        loop = FixedStepLoop(replay.step, reader.meta['dt'], speed=reader.meta['speed'], state=replay.state)
+    else:
+        scene = Scene()
+        radius = scene.radius()
+        on_step = None
+        if args.record:     #Klatka po każdym kroku fizyki; wiersz 0 to środek drutu
+            shape = scene.state().shape
+            recorder = TrajectoryRecorder(args.record, {'pos': ('f4', shape), 'vel': ('f4', shape)},
+                                          static={'radius': radius}, meta={'dt': dt, 'speed': dt * fps})
+            on_step = lambda loop: recorder.append(loop.time, pos=scene.state(), vel=scene.velocity())
+        loop = FixedStepLoop(scene.step, dt, substeps, speed=dt * fps, state=scene.state, on_step=on_step)
+
+    # Zaczynam symulację
+    run_simulation = True
+    while run_simulation:
+        window.fill((255, 255, 255))    #Okno koloru białego
+
+        #Sterowanie okręgiem klawiaturą
+        if scene is not None:
+            keys = pygame.key.get_pressed()
+            scene.wire_direction[:] = (keys[pygame.K_RIGHT] - keys[pygame.K_LEFT], keys[pygame.K_DOWN] - keys[pygame.K_UP])
+        alpha = loop.advance(clock.tick(fps) / 1000)    #Tyle kroków fizyki, ile należy się za czas klatki
+        state = loop.interpolated(alpha)
+
+        with profiler.section('render'):
+            pygame.draw.circle(window, (255, 0, 0), state[0].astype(int), int(wire_radius), width=2)
+            for pos, r in zip(state[1:], radius[1:]):
+                pygame.draw.circle(window, (0, 0, 255), pos.astype(int), int(r))
+
+        if profiler.enabled:    #Nakładka: p50 / p95 sekcji, średnie liczniki
+            profiler.draw(window, font)
+        pygame.display.flip()   #Odświeżenie ekranu
+        profiler.end_frame()
+        for e in pygame.event.get():
+            if e.type == pygame.QUIT:
+                if recorder is not None:
+                    recorder.close()
+                if args.profile:
+                    profiler.export(args.profile)
+                pygame.quit()
+                sys.exit()
+            elif e.type == pygame.KEYDOWN and e.key == pygame.K_F3:
+                profiler.enabled = not profiler.enabled
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,164 @@
+#Zespół B niezależnych scen z koralikami na drucie liczony naraz w tablicach (B,N,2), bez okna.
+#Tryb 'wire' - jak koraliki.py (rzut na okrąg, ruchomy drut), 'center' - jak koraliki2.py
+#(więz z ciężką kulką w środku). Trajektorie oddawane paczkami, np. do zbiorów uczących.
+import argparse
+import os
+import sys
+import time
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje import dyski
+from symulacje.profil import profiler
+
+#Parametry jak w koraliki.py / koraliki2.py
+dt = 0.05
+x_resolution = 1000
+y_resolution = 500
+gravity_vector = np.array([0, 100.0])
+wire_radius = min(x_resolution, y_resolution) * 0.4
+wire_speed = 30.0
+center_mass = 1e5
+MODES = ('wire', 'center')
+
+class Ensemble:
+    #radius, mass, angle: (B,N); wire_velocity: (B,2) albo None; gravity: (B,) bool albo jedna wartość
+    def __init__(self, radius, angle, mass=None, mode='wire', wire_velocity=None, gravity=True):
+        if mode not in MODES:
+            raise ValueError(f"Nieznany tryb {mode!r}, dostępne: {', '.join(MODES)}")
+        self.mode = mode
+        self.r = np.array(radius, dtype=float)
+        self.m = np.pi * self.r ** 2 if mass is None else np.array(mass, dtype=float)
+        b = len(self.r)
+        self.center = np.tile([x_resolution / 2, y_resolution / 2], (b, 1)).astype(float)
+        angle = np.asarray(angle, dtype=float)
+        self.pos = self.center[:, None, :] + wire_radius * np.stack((np.cos(angle), np.sin(angle)), axis=-1)
+        self.prev_pos = self.pos.copy()
+        self.v = np.zeros_like(self.pos)
+        self.wire_velocity = np.zeros((b, 2)) if wire_velocity is None else np.array(wire_velocity, dtype=float)
+        self.gravity = np.broadcast_to(np.asarray(gravity, dtype=bool), (b,)).copy()
+        self.time = 0.0
+
+    @classmethod
+    def random(cls, scenes, beads=6, mode='wire', seed=None, min_radius=10.0, max_radius=25.0,
+               mass_spread=0.0, push=(0.0, 4e4), wire_moving=True, gravity=None):
+        #Losowe promienie, masy (πr² razy 1±mass_spread), kąty startowe i jedno pchnięcie w każdej scenie
+        rng = np.random.default_rng(seed)
+        radius = rng.uniform(min_radius, max_radius, (scenes, beads))
+        mass = np.pi * radius ** 2 * rng.uniform(1 - mass_spread, 1 + mass_spread, (scenes, beads))
+        angle = np.sort(rng.uniform(0, 2 * np.pi, (scenes, beads)), axis=1)
+        wire_velocity = None
+        if mode == 'wire' and wire_moving:  #Kierunek sterowania jak ze strzałek: -1, 0, 1 w każdej osi
+            wire_velocity = rng.integers(-1, 2, (scenes, 2)) * wire_speed
+        if gravity is None:
+            gravity = mode == 'wire' or rng.random(scenes) < 0.5
+        ensemble = cls(radius, angle, mass, mode, wire_velocity, gravity)
+        #Pchnięcie jak kliknięcie myszą w losowy punkt losowego koralika
+        bead = rng.integers(0, beads, scenes)
+        phi = rng.uniform(0, 2 * np.pi, scenes)
+        ensemble.push(np.arange(scenes), bead, np.column_stack((np.cos(phi), np.sin(phi))),
+                      rng.uniform(*push, scenes))
+        return ensemble
+
+    @property
+    def shape(self):
+        return self.r.shape
+
+    def push(self, scene, bead, direction, strength):    #Impuls strength w kierunku direction (jednostkowym)
+        self.v[scene, bead] += direction * (strength / self.m[scene, bead])[:, None]
+
+    def step(self, dt=dt):
+        #Grawitacja i ruch wszystkich koralików naraz
+        with profiler.section('integrate'):
+            self.v += np.where(self.gravity[:, None, None], gravity_vector * dt, 0.0)
+            self.prev_pos[:] = self.pos
+            self.pos += self.v * dt
+        with profiler.section('constraints'):
+            self.constrain(dt)
+        self.collide()
+        self.time += dt
+
+    def constrain(self, dt=dt):     #Koraliki z powrotem na drut, prędkość z przesunięcia w kroku
+        if self.mode == 'wire':
+            self.center += self.wire_velocity * dt
+            delta = self.pos - self.center[:, None, :]
+            dist = np.linalg.norm(delta, axis=-1, keepdims=True)
+            self.pos += delta / dist * (wire_radius - dist)     #Rzut na okrąg
+            self.v = (self.pos - self.prev_pos) / dt + self.wire_velocity[:, None, :]
+        else:
+            for k in range(self.shape[1]):  #Kolejno po koralikach, bo każdy przesuwa środek (jak w skrypcie)
+                delta = self.pos[:, k] - self.center
+                dist = np.linalg.norm(delta, axis=1, keepdims=True)
+                n = delta / dist
+                w1 = 1.0 / self.m[:, k, None]
+                w2 = 1.0 / center_mass
+                correction = (dist - wire_radius) / (w1 + w2)
+                self.pos[:, k] -= w1 * correction * n
+                self.center += w2 * correction * n
+            self.v = (self.pos - self.prev_pos) / dt
+
+    def collide(self):  #Sprężyste zderzenia koralików, wspólne z pozostałymi scenami (symulacje.dyski)
+        dyski.resolve_batched(self.pos, self.v, self.r, self.m)
+
+    def trajectory(self, steps, chunk=256, every=1, dt=dt):
+        #Generator paczek położeń (≤chunk, B, N, 2) float32, zapis co every kroków
+        buffer = np.empty((chunk,) + self.pos.shape, dtype=np.float32)
+        filled = 0
+        for step in range(1, steps + 1):
+            self.step(dt)
+            profiler.end_frame()
+            if step % every == 0:
+                buffer[filled] = self.pos
+                filled += 1
+                if filled == chunk:
+                    yield buffer
+                    filled = 0
+        if filled:
+            yield buffer[:filled]
+
+    def parameters(self):   #Parametry scen - do zapisania obok trajektorii
+        return dict(radius=self.r, mass=self.m, gravity=self.gravity, wire_velocity=self.wire_velocity,
+                    velocity=self.v, position=self.pos, mode=self.mode)
+
+def main():
+    parser = argparse.ArgumentParser(description='Zespół scen z koralikami liczony bez okna')
+    parser.add_argument('--scenes', type=int, default=4096)
+    parser.add_argument('--beads', type=int, default=6)
+    parser.add_argument('--steps', type=int, default=1000)
+    parser.add_argument('--mode', choices=MODES, default='wire')
+    parser.add_argument('--chunk', type=int, default=256, help='Klatki w jednej paczce')
+    parser.add_argument('--every', type=int, default=1, help='Zapis co tyle kroków')
+    parser.add_argument('--mass-spread', type=float, default=0.0)
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--out', help='Plik .npy na trajektorie (B,N,2) na klatkę; bez tego tylko pomiar')
+    parser.add_argument('--profile', help='Oś czasu sekcji kroku do pliku .csv albo .json')
+    args = parser.parse_args()
+    profiler.enabled = profiler.enabled or args.profile is not None
+    profiler.keep_timeline = args.profile is not None   #Oś czasu tylko do zapisu, nakładce wystarczy okno
+
+    ensemble = Ensemble.random(args.scenes, args.beads, args.mode, args.seed, mass_spread=args.mass_spread)
+    out = None
+    if args.out:
+        frames = args.steps // args.every
+        out = np.lib.format.open_memmap(args.out, mode='w+', dtype=np.float32,
+                                        shape=(frames,) + ensemble.pos.shape)
+        np.savez(args.out[:-4] + '_parametry.npz' if args.out.endswith('.npy') else args.out + '_parametry.npz',
+                 **ensemble.parameters())
+
+    start = time.perf_counter()
+    frame = 0
+    for block in ensemble.trajectory(args.steps, args.chunk, args.every):
+        if out is not None:
+            out[frame:frame + len(block)] = block
+        frame += len(block)
+    elapsed = time.perf_counter() - start
+    if out is not None:
+        out.flush()
+    if args.profile:
+        profiler.export(args.profile)
+    bead_steps = args.scenes * args.beads * args.steps
+    print(f'{args.scenes} scen x {args.beads} koralików x {args.steps} kroków: {elapsed:.2f} s, '
+          f'{bead_steps / elapsed / 1e6:.2f} mln kroków koralika/s')
+
+if __name__ == '__main__':
+    main()
@@ -1,190 +1,31 @@
-#Sterowanie: 1 - Bounding Volume Hierarchy, 2 - Sweep and Prune, 3 - Brute Force
+#Sterowanie: 1 - Bounding Volume Hierarchy, 2 - Sweep and Prune, 3 - Brute Force, 4 - Siatka jednorodna
+#F - BVH: refit między klatkami / budowa od zera, P - detekcja równoległa na wszystkich rdzeniach
+#V - rysowanie z buforów VBO / po jednym pudełku, R - reakcja na kolizję, J - jądra Numba / NumPy
+#--record plik - zapis przebiegu, --replay plik - odtworzenie zapisu bez liczenia fizyki
+#F3 - profiler (p95 sekcji w tytule), --profile plik - profiler od startu i zapis osi czasu (.csv/.json)
+import argparse
+import os
 import sys
 import time
-import random
 import numpy as np
 import pygame
 from pygame.locals import *
 from OpenGL.GL import *
 from OpenGL.GLU import *
-from pymorton import interleave3
 
-# Parametry konfiguracji
-box_count = 1000
-world_size = 100.0
-min_box_size = 1.0
-max_box_size = 10.0
-max_speed = 0.7
-window_size = (1280, 720)
-
-#Domyślny algorytm: 'bvh', 'sweep', 'bruteforce'
-algorithm = 'bvh'
-
-class Box:
-    def __init__(self, idx):
-        self.id = idx
-        self.width = random.randint(min_box_size, max_box_size)
-        self.height = random.randint(min_box_size, max_box_size)
-        self.depth = random.randint(min_box_size, max_box_size)
-
-        self.pos = np.array([
-            random.randint(-world_size/2, world_size/2),
-            random.randint(-world_size/2, world_size/2),
-            random.randint(-world_size/2, world_size/2)
-        ], dtype=np.float32)
-
-        self.vel = np.array([   #od -0.5 max_speed do 0.5 max_speed
-            (random.random() - 0.5) * max_speed,
-            (random.random() - 0.5) * max_speed,
-            (random.random() - 0.5) * max_speed
-        ], dtype=np.float32)
-
-        self.color = (
-    random.uniform(0.3, 1.0),
-    random.uniform(0.3, 1.0),
-    random.uniform(0.3, 1.0))
-        self.is_colliding = False
-
-    def update(self):
-        self.pos += self.vel    #Brak reakcji na kolizję
-        half = world_size / 2.0 
-        for i in range(3):  #Kołowe warunki brzegowe
-            if self.pos[i] > half:
-                self.pos[i] = -half
-            elif self.pos[i] < -half:
-                self.pos[i] = half
-        self.is_colliding = False   #Czyszczenie flag kolizji
-
-    def get_aabb(self): #granice pudełka
-        half_sizes = np.array([self.width / 2.0, self.height / 2.0, self.depth / 2.0])
-        return self.pos - half_sizes, self.pos + half_sizes
-
-class BVHNode:
-    def __init__(self):
-        self.left = None
-        self.right = None
-        self.box_id = -1
-        self.a_min = np.array([np.inf, np.inf, np.inf], dtype=np.float32)
-        self.a_max = np.array([-np.inf, -np.inf, -np.inf], dtype=np.float32)
-
-    def is_leaf(self):  #Węzeł czy liść
-        return self.box_id != -1    
-
-#Sprawdzenie przecięcia prostopadłościanów (AABB– Axis-Aligned Bounding Boxes)
-def aabb_intersect(a_min, a_max, b_min, b_max):
-    return np.all(a_min <= b_max) and np.all(a_max >= b_min)    #True/False- do kolizji potrzebujemy pokrycia dla 3 osi
-
-def calculate_morton_code(x, y, z):
-
-    def norm(v):    #Do przedzaiłu [0,1]
-        return (v + world_size / 2.0) / world_size
-    
-    x = min(max(norm(x), 0.0), 1.0)
-    y = min(max(norm(y), 0.0), 1.0)
-    z = min(max(norm(z), 0.0), 1.0)
-    xi = min(int(x * 1023), 1023)   #Współrzędne do całkowitej 10-bitowej liczby
-    yi = min(int(y * 1023), 1023)
-    zi = min(int(z * 1023), 1023)
-    return interleave3(xi, yi, zi)  #Bity w kod Mortona
-
-#Konstrukcja BVH (liść drzewa to 1 pudełko)
-def create_leaf(box_id, boxes):
-    node = BVHNode()
-    node.box_id = box_id
-    a_min, a_max = boxes[box_id].get_aabb()
-    node.a_min = a_min.copy()
-    node.a_max = a_max.copy()
-    return node
-
-def create_subtree(lst, begin, end, boxes):
-    if begin == end:    #lst zawiera jeden element
-        return create_leaf(lst[begin]['id'], boxes)
-    
-    #Rekurencyjne budowanie poddrzewa 
-    mid = (begin + end) // 2
-    node = BVHNode()
-    node.left = create_subtree(lst, begin, mid, boxes)
-    node.right = create_subtree(lst, mid + 1, end, boxes)
-    node.a_min = np.minimum(node.left.a_min, node.right.a_min)  #Obwiednia węzła
-    node.a_max = np.maximum(node.left.a_max, node.right.a_max)
-    return node
+from swiat import BoxWorld, box_count, world_size
+from symulacja import Simulation
+from rysowanie import BoxRenderer
 
-def create_bvh(boxes):
-    lst = []
-    for i, b in enumerate(boxes):
-        code = calculate_morton_code(b.pos[0], b.pos[1], b.pos[2])
-        lst.append({'id': i, 'morton': code})
-    lst.sort(key=lambda x: x['morton'])
-    return create_subtree(lst, 0, len(lst) - 1, boxes)
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje import jit
+from symulacje.profil import profiler
+from symulacje.zapis import TrajectoryRecorder, TrajectoryReader, Replay
 
-#Detekcja kolizji Bounding Volume Hierarchy
-def find_collisions_bvh(box_id, box, node, boxes, collisions, check_count):
-    check_count[0] += 1
-
-    a_min, a_max = box.get_aabb()
-    if not aabb_intersect(a_min, a_max, node.a_min, node.a_max): #Czy pudełko w węźle
-        return
-    
-    if node.is_leaf():
-        if node.box_id != box_id:
-            other = boxes[node.box_id]
-            bmin, bmax = other.get_aabb()
-            if aabb_intersect(a_min, a_max, bmin, bmax):
-                collisions.append((box_id, node.box_id))
-        return
-    find_collisions_bvh(box_id, box, node.left, boxes, collisions, check_count)
-    find_collisions_bvh(box_id, box, node.right, boxes, collisions, check_count)
-
-def check_collisions_bvh(boxes, root):
-    collisions = []
-    check_count = [0]   #Zmienna do zliczania kolizji, jest w fotmie tab bo potrzebuję przekazywana przez referencje
-    for i, b in enumerate(boxes):
-        find_collisions_bvh(i, b, root, boxes, collisions, check_count)
-    return collisions, check_count[0]
-
-#Detekcja kolizji Brute-force
-def check_collisions_bruteforce(boxes):
-    collisions = []
-    check_count = int(box_count*(box_count-1)/2)
-
-    n = len(boxes)
-    for i in range(n):
-        a_min, a_max = boxes[i].get_aabb()
-        for j in range(i + 1, n):
-            b_min, b_max = boxes[j].get_aabb()
-            if aabb_intersect(a_min, a_max, b_min, b_max):
-                collisions.append((i, j))
-    return collisions, check_count
-
-#Detekcja kolizji Sweep and Prune (sortowanie w osi x a następnie testy)
-def check_collisions_sweep_and_prune(boxes):
-    intervals = []  #Lista krotek (minx, maxx, id)
-    active = []  #Lista krotek (maxx, id)
-    collisions = []
-    check_count = 0
-
-    for b in boxes:
-        a_min, a_max = b.get_aabb()
-        intervals.append((a_min[0], a_max[0], b.id))
-    intervals.sort(key=lambda it: it[0])    #Po minx
+window_size = (1280, 720)
 
-    for minx, maxx, b in intervals:
-        #Usuwanie pudełek które kończą się przed bieżącym minx
-        new_active = []
-        for i in active:
-            if i[0] >= minx:
-                new_active.append(i)
-        active = new_active
-        
-        #Porównanie z pozostałymi pudełkami
-        for maxx_act, act in active:
-            check_count += 1
-            a_min, a_max = boxes[act].get_aabb()
-            b_min, b_max = boxes[b].get_aabb()
-            if aabb_intersect(a_min, a_max, b_min, b_max):
-                collisions.append((act, b))
-        active.append((maxx, b))    #Pudełko z tej pętli może kolidować z innymi (bo spr tylko do mniejszego minx tzn tych z stworzonego wcześneij active)
-    return collisions, check_count
+#Domyślny algorytm: 'bvh', 'sweep', 'bruteforce', 'grid'
+algorithm = 'bvh'
 
 # Rysowanie kostki
 def draw_cube(half_sizes):      #rysowanie sześcianu wyśrodkowanego w punkcie początkowym i skalowanego do rozmiarów połówkowych
@@ -234,6 +75,14 @@ def perspective(fov, screen, near, far):    #screen = szerokość / wysokość e
 
 def main():
     global algorithm    #Czyta zmienną algorithm
+    parser = argparse.ArgumentParser(description='Wykrywanie kolizji wielu pudełek')
+    parser.add_argument('--record', help='Zapis przebiegu do pliku')
+    parser.add_argument('--replay', help='Odtworzenie zapisu z pliku bez liczenia fizyki')
+    parser.add_argument('--profile', help='Zapis osi czasu profilera do pliku .csv albo .json')
+    args = parser.parse_args()
+    profiler.enabled = profiler.enabled or args.profile is not None
+    profiler.keep_timeline = args.profile is not None   #Oś czasu tylko do zapisu, nakładce wystarczy okno
+
     pygame.init()
     pygame.display.set_mode(window_size, DOUBLEBUF | OPENGL)    #DOUBLEBUF by obiekty były wyświetlane na raz
 
@@ -246,7 +95,25 @@ def main():
     glTranslatef(0.0, 0.0, -150.0)  #Ustawienia kamery tak by widać było całą planszę
     init_opengl()
 
-    boxes = [Box(i) for i in range(box_count)] #Tworzenie pudełek
+    sim = recorder = replay = None
+    if args.replay:
+        reader = TrajectoryReader(args.replay)
+        replay = Replay(reader)
+        #Kopie - klatki z pliku są tylko do odczytu, a świat nadpisywany jest co klatkę
+        world = BoxWorld(*(np.array(a, copy=True) for a in (reader[0]['pos'], reader[0]['vel'],
+                                                             reader.static['half'], reader.static['color'])),
+                         size=reader.meta.get('size', world_size))
+    else:
+        sim = Simulation(BoxWorld.random(box_count), algorithm)  #Tworzenie pudełek
+        world = sim.world
+        if args.record:
+            shape = world.pos.shape
+            recorder = TrajectoryRecorder(args.record, {'pos': ('f4', shape), 'vel': ('f4', shape),
+                                                        'colliding': (bool, (len(world),))},
+                                          static={'half': world.half, 'color': world.color},
+                                          meta={'size': world.size})
+    renderer = BoxRenderer()
+    batched = True
     clock = pygame.time.Clock()
     running = True
 
@@ -263,63 +130,102 @@ def main():
                     algorithm = 'sweep'
                 elif event.key == K_3:
                     algorithm = 'bruteforce'
-
-        for b in boxes:
-            b.update()
-
-        t1 = time.time()
-        if algorithm == 'bvh':
-            root = create_bvh(boxes)
-            collisions, checks = check_collisions_bvh(boxes, root)
-        elif algorithm == 'sweep':
-            collisions, checks = check_collisions_sweep_and_prune(boxes)
+                elif event.key == K_4:
+                    algorithm = 'grid'
+                elif event.key == K_f and sim is not None:
+                    sim.bvh_refit = not sim.bvh_refit
+                elif event.key == K_p and sim is not None:
+                    sim.workers = 0 if sim.workers else os.cpu_count()
+                elif event.key == K_v:
+                    batched = not batched
+                elif event.key == K_r and sim is not None:
+                    sim.response = not sim.response
+                elif event.key == K_j and jit.AVAILABLE:
+                    jit.use_jit(not jit.enabled())
+                elif event.key == K_F3:
+                    profiler.enabled = not profiler.enabled
+
+        if replay is not None:  #Klatka z pliku zamiast kroku symulacji
+            frame = replay.frame()
+            world.pos[:] = frame['pos']
+            world.vel[:] = frame['vel']
+            world.colliding[:] = frame['colliding']
+            replay.step(1)
         else:
-            collisions, checks = check_collisions_bruteforce(boxes)
-        t2 = time.time()
-
-        # Oznaczenie kolidujących pudełek
-        for a, b in collisions:
-            boxes[a].is_colliding = True
-            boxes[b].is_colliding = True
+            sim.algorithm = algorithm
+            collisions, checks = sim.step()
+            if recorder is not None:    #Czas w krokach świata
+                recorder.append(recorder.frames, pos=world.pos, vel=world.vel, colliding=world.colliding)
 
         # Wyświetlanie
-        glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
-        glPushMatrix()      #Zapis aktualnej macierzy transformacji
-
-        # Rysowanie planszy (sześcianu)
-        glDisable(GL_LIGHTING)
-        glColor3f(0.2, 0.2, 0.2)
-        glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
-        glPushMatrix()
-        glScalef(world_size, world_size, world_size)
-        draw_cube((0.5, 0.5, 0.5))
-        glPopMatrix()       #Przywrócenie ostatnio zapisanej macierzy transformacji
-        glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
-        glEnable(GL_LIGHTING)
-
-        # Rysowanie pudełek
-        for b in boxes:
+        t_render = time.perf_counter()
+        with profiler.section('render'):
+            glClear(GL_COLOR_BUFFER_BIT | GL_DEPTH_BUFFER_BIT)
+            glPushMatrix()      #Zapis aktualnej macierzy transformacji
+
+            # Rysowanie planszy (sześcianu)
+            glDisable(GL_LIGHTING)
+            glColor3f(0.2, 0.2, 0.2)
+            glPolygonMode(GL_FRONT_AND_BACK, GL_LINE)
             glPushMatrix()
-            glTranslatef(b.pos[0], b.pos[1], b.pos[2])
-            half = (b.width / 2.0, b.height / 2.0, b.depth / 2.0)
-            if b.is_colliding:
-                glColor3f(1.0, 0.2, 0.0)    #Czerwony
-                
+            glScalef(world.size, world.size, world.size)
+            draw_cube((0.5, 0.5, 0.5))
+            glPopMatrix()       #Przywrócenie ostatnio zapisanej macierzy transformacji
+            glPolygonMode(GL_FRONT_AND_BACK, GL_FILL)
+            glEnable(GL_LIGHTING)
+
+            # Rysowanie pudełek
+            if batched:
+                renderer.draw(world)
             else:
-                glColor3fv(b.color)
+                for pos, half, color, colliding in zip(world.pos.tolist(), world.half.tolist(),
+                                                       world.color.tolist(), world.colliding.tolist()):
+                    glPushMatrix()
+                    glTranslatef(*pos)
+                    if colliding:
+                        glColor3f(1.0, 0.2, 0.0)    #Czerwony
 
-            draw_cube(half)
-            glPopMatrix()
+                    else:
+                        glColor3fv(color)
 
-        glPopMatrix()
-        pygame.display.flip()   #Wyświetlenie nowej klatki
+                    draw_cube(half)
+                    glPopMatrix()
+
+            glPopMatrix()
+            pygame.display.flip()   #Wyświetlenie nowej klatki
+        render_time = time.perf_counter() - t_render
+        profiler.end_frame()
 
         fps = clock.get_fps()
-        title = (f"Alg: {algorithm.upper()} | Boxes: {len(boxes)}  Collisions: {len(collisions)}  "
-                 f"Time: {(t2-t1)*1000:.2f} ms  Checks: {checks}  FPS: {fps:.1f}")
+        if replay is not None:
+            pygame.display.set_caption(f"Replay: {replay.index + 1}/{len(replay.reader)} | Boxes: {len(world)}  "
+                                       f"Colliding boxes: {int(world.colliding.sum())}  FPS: {fps:.1f}  "
+                                       f"Draw: {render_time*1000:.1f} ms")
+            clock.tick(30)
+            continue
+        title = (f"Alg: {algorithm.upper()}{' (JIT)' if jit.enabled() else ''} | Boxes: {len(world)}  Collisions: {len(collisions)}  "
+                 f"Time: {sim.detect_time*1000:.2f} ms  Checks: {checks}  FPS: {fps:.1f}  "
+                 f"Sim/Det/Draw: {sim.simulate_time*1000:.1f}/{sim.detect_time*1000:.1f}/{render_time*1000:.1f} ms")
+        if sim.response:
+            title += f"  Contacts: {sim.contacts} ({sim.response_time*1000:.1f} ms)"
+        if algorithm.startswith('bvh') and sim.bvh_refit:
+            title += f"  Refit/Rebuild: {sim.bvh_refits}/{sim.bvh_rebuilds}"
+        if sim.parallel is not None and sim.workers:
+            worst = max(t['time'] for t in sim.parallel.timings) if sim.parallel.timings else 0.0
+            title += f"  Workers: {sim.workers} (max {worst*1000:.1f} ms, imbalance {sim.parallel.imbalance():.2f})"
+        if profiler.enabled:    #p95 sekcji z ostatnich klatek [ms]
+            summary = profiler.summary()
+            title += "  p95: " + " ".join(f"{name} {summary[name]['p95']:.1f}" for name in profiler.sections if name in summary)
         pygame.display.set_caption(title)
         clock.tick(30)  #Ograniczam symulacje do 30 FPS
 
+    if sim is not None:
+        sim.close()
+    if recorder is not None:
+        recorder.close()
+    if args.profile:
+        profiler.export(args.profile)
+    renderer.close()
     pygame.quit()
     sys.exit()
 
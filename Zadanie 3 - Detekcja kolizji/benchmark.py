@@ -0,0 +1,127 @@
+#Pomiary algorytmów detekcji bez pygame i OpenGL
+#Przykład: python benchmark.py --counts 1000 5000 --sizes 1-10 1-3 --distributions uniform clustered --out wyniki.csv
+import argparse
+import csv
+import hashlib
+import itertools
+import json
+import sys
+import time
+import tracemalloc
+import numpy as np
+
+from swiat import BoxWorld, world_size, max_speed
+from symulacja import Simulation, ALGORITHMS
+from symulacje.profil import profiler   #Ścieżkę do pakietu dodaje symulacja
+
+#Algorytmy kwadratowe pomijam powyżej tej liczby pudełek (można zmienić --limit)
+SLOW_LIMITS = {'bruteforce': 5000, 'bvh_query': 5000, 'sweep_static': 20000}
+
+def pair_key(collisions):   #Liczba par i skrót zbioru par niezależny od kolejności i duplikatów
+    pairs = np.asarray(collisions, dtype=np.int64).reshape(-1, 2)
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)
+    return len(pairs), hashlib.sha1(pairs.tobytes()).hexdigest()
+
+def run_case(world, algorithm, frames, warmup, workers=0):
+    sim = Simulation(world.copy(), algorithm, workers=workers)
+    profiling, profiler.enabled = profiler.enabled, False   #Profiler (--profile) tylko w mierzonych klatkach
+    for _ in range(warmup):     #Rozgrzewka - struktury trwałe (BVH, SaP) startują od zera
+        sim.step()
+    profiler.enabled = profiling
+    build = query = 0.0
+    checks = 0
+    keys = []
+    for _ in range(frames):
+        collisions, c = sim.step()
+        build += sim.build_time
+        query += sim.detect_time - sim.build_time
+        checks += c
+        keys.append(pair_key(collisions))
+        profiler.end_frame(algorithm=algorithm, workers=workers, count=len(world))
+
+    #Pamięć w osobnej klatce, żeby tracemalloc nie zawyżał czasów
+    profiler.enabled = False
+    tracemalloc.start()
+    sim.step()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    profiler.enabled = profiling
+    timings = sim.parallel.timings if sim.parallel is not None else []
+    sim.close()
+
+    row = {'algorithm': algorithm,
+           'build_ms': build / frames * 1000, 'query_ms': query / frames * 1000,
+           'checks': checks // frames, 'pairs': keys[-1][0], 'peak_mb': peak / 2 ** 20,
+           'workers': workers, 'worker_ms': [round(t['time'] * 1000, 3) for t in timings]}
+    return row, keys
+
+def run(counts, sizes, speeds, distributions, algorithms, frames, warmup, seed, limit=None, workers=(0,)):
+    rows = []
+    for count, (min_size, max_size), speed, distribution in itertools.product(counts, sizes, speeds, distributions):
+        world = BoxWorld.random(count, world_size, min_size, max_size, speed, seed, distribution)
+        reference = None
+        for algorithm, w in itertools.product(algorithms, workers):
+            max_count = SLOW_LIMITS.get(algorithm) if limit is None else limit
+            if max_count is not None and count > max_count:
+                continue
+            row, keys = run_case(world, algorithm, frames, warmup, w)
+            if reference is None:
+                reference = keys
+            row['valid'] = keys == reference    #Ten sam zbiór par w każdej klatce co pierwszy algorytm
+            row.update(count=count, min_size=min_size, max_size=max_size, speed=speed,
+                       distribution=distribution, frames=frames)
+            rows.append(row)
+            print(f"{distribution:9s} N={count:6d} size={min_size:g}-{max_size:g} v={speed:g} "
+                  f"{algorithm:12s} x{w:<2d} build {row['build_ms']:9.2f} ms  query {row['query_ms']:9.2f} ms  "
+                  f"checks {row['checks']:10d}  pairs {row['pairs']:8d}  peak {row['peak_mb']:7.1f} MB"
+                  f"{'' if row['valid'] else '  NIEZGODNE PARY'}", file=sys.stderr)
+    return rows
+
+FIELDS = ['algorithm', 'workers', 'count', 'min_size', 'max_size', 'speed', 'distribution', 'frames',
+          'build_ms', 'query_ms', 'checks', 'pairs', 'peak_mb', 'valid', 'worker_ms']
+
+def save(rows, path):
+    if path.endswith('.json'):
+        with open(path, 'w') as f:
+            json.dump(rows, f, indent=1)
+    else:
+        with open(path, 'w', newline='') as f:
+            writer = csv.DictWriter(f, fieldnames=FIELDS)
+            writer.writeheader()
+            writer.writerows(rows)
+
+def parse_size(text):   #"1-10" -> (1.0, 10.0)
+    lo, hi = text.split('-')
+    return float(lo), float(hi)
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark algorytmów detekcji kolizji")
+    parser.add_argument('--counts', type=int, nargs='+', default=[1000, 5000, 20000])
+    parser.add_argument('--sizes', type=parse_size, nargs='+', default=[(1.0, 10.0)])
+    parser.add_argument('--speeds', type=float, nargs='+', default=[max_speed])
+    parser.add_argument('--distributions', nargs='+', default=['uniform', 'clustered'])
+    parser.add_argument('--algorithms', nargs='+', default=list(ALGORITHMS), choices=ALGORITHMS)
+    parser.add_argument('--frames', type=int, default=5)
+    parser.add_argument('--warmup', type=int, default=1)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--workers', type=int, nargs='+', default=[0], help="0 - szeregowo, k - k procesów")
+    parser.add_argument('--limit', type=int, default=None, help="maksymalna liczba pudełek dla każdego algorytmu")
+    parser.add_argument('--out', default=None, help="plik .csv albo .json")
+    parser.add_argument('--profile', default=None, help="oś czasu sekcji i liczników klatka po klatce (.csv albo .json)")
+    args = parser.parse_args()
+    profiler.enabled = profiler.enabled or args.profile is not None
+    profiler.keep_timeline = args.profile is not None   #Oś czasu tylko do zapisu, nakładce wystarczy okno
+
+    t = time.perf_counter()
+    rows = run(args.counts, args.sizes, args.speeds, args.distributions, args.algorithms,
+               args.frames, args.warmup, args.seed, args.limit, args.workers)
+    if args.out:
+        save(rows, args.out)
+    if args.profile:
+        profiler.export(args.profile)
+    print(f"{len(rows)} pomiarów w {time.perf_counter() - t:.1f} s", file=sys.stderr)
+    if not all(row['valid'] for row in rows):
+        sys.exit(1)
+
+if __name__ == '__main__':
+    main()
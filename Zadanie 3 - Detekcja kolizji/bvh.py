@@ -0,0 +1,183 @@
+#Liniowe BVH (LBVH) w płaskich tablicach, budowane na danych z BoxWorld
+import numpy as np
+
+from swiat import aabb_intersect, bvh_rebuild_threshold
+import jadra
+
+def expand_bits(v):     #10 bitów -> 30 bitów, dwa zera między kolejnymi bitami
+    v = v.astype(np.uint32)
+    v = (v * np.uint32(0x00010001)) & np.uint32(0xFF0000FF)
+    v = (v * np.uint32(0x00000101)) & np.uint32(0x0F00F00F)
+    v = (v * np.uint32(0x00000011)) & np.uint32(0xC30C30C3)
+    v = (v * np.uint32(0x00000005)) & np.uint32(0x49249249)
+    return v
+
+def morton_codes(pos, size):   #30-bitowe kody Mortona dla wszystkich pudełek naraz
+    norm = np.clip((pos + size / 2.0) / size, 0.0, 1.0)    #Do przedzaiłu [0,1]
+    q = np.minimum((norm * 1023).astype(np.uint32), 1023)   #Współrzędne do całkowitej 10-bitowej liczby
+    return expand_bits(q[:, 0]) | (expand_bits(q[:, 1]) << 1) | (expand_bits(q[:, 2]) << 2)
+
+class BVH:
+    #Węzeł k: dzieci left[k], right[k] (-1 w liściu), pudełko box_id[k] (-1 w węźle wewnętrznym)
+    def __init__(self, left, right, box_id, levels):
+        self.left = left
+        self.right = right
+        self.box_id = box_id
+        self.levels = levels    #Indeksy węzłów wewnętrznych poziom po poziomie od korzenia
+        self.leaves = np.flatnonzero(box_id >= 0)
+        self.leaf_boxes = box_id[self.leaves]
+        self.inner = np.flatnonzero(box_id < 0)
+        self.a_min = np.empty((len(left), 3), dtype=np.float32)
+        self.a_max = np.empty((len(left), 3), dtype=np.float32)
+
+    def __len__(self):
+        return len(self.left)
+
+    def is_leaf(self, node):    #Węzeł czy liść
+        return self.box_id[node] != -1
+
+    def update_bounds(self, world):
+        #Liście z granic pudełek, potem węzły wewnętrzne od dołu całymi poziomami
+        self.a_min[self.leaves] = world.aabb_min[self.leaf_boxes]
+        self.a_max[self.leaves] = world.aabb_max[self.leaf_boxes]
+        for level in reversed(self.levels):
+            l, r = self.left[level], self.right[level]
+            self.a_min[level] = np.minimum(self.a_min[l], self.a_min[r])  #Obwiednia węzła
+            self.a_max[level] = np.maximum(self.a_max[l], self.a_max[r])
+
+    def sah_cost(self):   #Suma pól powierzchni węzłów wewnętrznych względem korzenia (koszt SAH)
+        ext = self.a_max[self.inner] - self.a_min[self.inner]
+        area = ext[:, 0] * ext[:, 1] + ext[:, 1] * ext[:, 2] + ext[:, 2] * ext[:, 0]
+        root = self.a_max[0] - self.a_min[0]
+        root_area = root[0] * root[1] + root[1] * root[2] + root[2] * root[0]
+        return float(area.sum() / root_area) if len(area) else 0.0
+
+#Konstrukcja BVH (liść drzewa to 1 pudełko), podział listy posortowanej po kodach Mortona w połowie
+def create_bvh(world):
+    n = len(world)
+    order = np.argsort(morton_codes(world.pos, world.size), kind='stable')
+
+    left = np.full(2 * n - 1, -1, dtype=np.int64)
+    right = np.full(2 * n - 1, -1, dtype=np.int64)
+    box_id = np.full(2 * n - 1, -1, dtype=np.int64)
+    levels = []
+
+    #Wszystkie węzły jednego poziomu naraz: węzeł ids[k] obejmuje order[begin[k]:end[k]+1]
+    ids = np.zeros(1, dtype=np.int64)
+    begin = np.zeros(1, dtype=np.int64)
+    end = np.full(1, n - 1, dtype=np.int64)
+    next_free = 1
+    while True:
+        leaf = begin == end
+        box_id[ids[leaf]] = order[begin[leaf]]
+
+        inner = ~leaf
+        ids, begin, end = ids[inner], begin[inner], end[inner]
+        if len(ids) == 0:
+            break
+        levels.append(ids)
+        mid = (begin + end) // 2
+        children = next_free + np.arange(2 * len(ids))
+        next_free += len(children)
+        left[ids] = children[0::2]
+        right[ids] = children[1::2]
+
+        ids = children
+        begin = np.stack((begin, mid + 1), axis=1).ravel()
+        end = np.stack((mid, end), axis=1).ravel()
+
+    bvh = BVH(left, right, box_id, levels)
+    bvh.update_bounds(world)
+    return bvh
+
+#BVH utrzymywane między klatkami: refit granic w O(N), przebudowa gdy jakość drzewa spadnie
+class DynamicBVH:
+    def __init__(self, rebuild_threshold=bvh_rebuild_threshold):
+        self.rebuild_threshold = rebuild_threshold
+        self.bvh = None
+        self.build_cost = 0.0   #Koszt SAH tuż po budowie
+        self.cost = 0.0
+        self.refits = 0
+        self.rebuilds = 0
+
+    def update(self, world):
+        if self.bvh is None or len(self.bvh.leaves) != len(world):
+            return self.rebuild(world)
+        self.bvh.update_bounds(world)   #Topologia bez zmian, tylko nowe obwiednie
+        self.cost = self.bvh.sah_cost()
+        if self.cost > self.rebuild_threshold * self.build_cost:    #Np. po przeskoku pudełka przez brzeg świata
+            return self.rebuild(world)
+        self.refits += 1
+        return self.bvh
+
+    def rebuild(self, world):
+        self.bvh = create_bvh(world)
+        self.build_cost = self.cost = self.bvh.sah_cost()
+        self.rebuilds += 1
+        return self.bvh
+
+#Detekcja kolizji Bounding Volume Hierarchy
+def find_collisions_bvh(box_id, a_min, a_max, bvh, node, collisions, check_count):
+    check_count[0] += 1
+
+    if not aabb_intersect(a_min, a_max, bvh.a_min[node], bvh.a_max[node]): #Czy pudełko w węźle
+        return
+
+    if bvh.is_leaf(node):
+        if bvh.box_id[node] != box_id:  #Liść ma już granice pudełka, nie trzeba ich liczyć ponownie
+            collisions.append((box_id, int(bvh.box_id[node])))
+        return
+    find_collisions_bvh(box_id, a_min, a_max, bvh, bvh.left[node], collisions, check_count)
+    find_collisions_bvh(box_id, a_min, a_max, bvh, bvh.right[node], collisions, check_count)
+
+def check_collisions_bvh(world, bvh):
+    if jadra.jit.enabled():   #Skompilowana pętla zamiast rekurencji w Pythonie
+        collisions, checks = jadra.bvh_query(bvh.left, bvh.right, bvh.box_id, bvh.a_min, bvh.a_max,
+                                             world.aabb_min, world.aabb_max)
+        return [tuple(pair) for pair in collisions.tolist()], checks
+    collisions = []
+    check_count = [0]   #Zmienna do zliczania kolizji, jest w fotmie tab bo potrzebuję przekazywana przez referencje
+    for i in range(len(world)):
+        find_collisions_bvh(i, world.aabb_min[i], world.aabb_max[i], bvh, 0, collisions, check_count)
+    return collisions, check_count[0]
+
+#Przecięcie drzewa z samym sobą: pary węzłów schodzą razem, każda para pudełek raz
+def check_collisions_bvh_pairs(bvh, batch=1 << 16):
+    left, right, box_id = bvh.left, bvh.right, bvh.box_id
+    lo, hi = bvh.a_min, bvh.a_max
+    ext = hi - lo
+    area = ext[:, 0] * ext[:, 1] + ext[:, 1] * ext[:, 2] + ext[:, 2] * ext[:, 0]
+    leaf = box_id >= 0
+    if jadra.jit.enabled():
+        return jadra.bvh_pairs(left, right, box_id, bvh.inner, lo, hi, area)
+
+    #Para (węzeł, węzeł) rozpada się na pary dzieci, więc wystarczy zacząć od (lewe, prawe) każdego węzła
+    stack = [(left[bvh.inner], right[bvh.inner])]   #Jawny stos paczek par węzłów zamiast rekurencji
+    found_a, found_b = [], []
+    check_count = 0
+    while stack:
+        a, b = stack.pop()
+        if len(a) > batch:  #Zdejmuję ze stosu co najwyżej batch par naraz
+            stack.append((a[batch:], b[batch:]))
+            a, b = a[:batch], b[:batch]
+
+        check_count += len(a)
+        hit = np.all(lo[a] <= hi[b], axis=1) & np.all(hi[a] >= lo[b], axis=1)
+        a, b = a[hit], b[hit]
+
+        both = leaf[a] & leaf[b]
+        found_a.append(box_id[a[both]])
+        found_b.append(box_id[b[both]])
+        a, b = a[~both], b[~both]
+        if len(a) == 0:
+            continue
+
+        #Dzielę węzeł wewnętrzny o większej powierzchni (albo jedyny wewnętrzny)
+        split_a = ~leaf[a] & (leaf[b] | (area[a] >= area[b]))
+        sa, sb = a[split_a], b[split_a]
+        ta, tb = a[~split_a], b[~split_a]
+        stack.append((np.concatenate((left[sa], right[sa], ta, ta)),
+                      np.concatenate((sb, sb, left[tb], right[tb]))))
+
+    collisions = np.stack((np.concatenate(found_a), np.concatenate(found_b)), axis=1)
+    return collisions, check_count
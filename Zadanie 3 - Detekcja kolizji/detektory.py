@@ -0,0 +1,37 @@
+#Detektory kolizji czytające granice pudełek bezpośrednio z tablic BoxWorld
+import numpy as np
+
+#Detekcja kolizji Brute-force
+def check_collisions_bruteforce(world):
+    collisions = []
+    n = len(world)
+    check_count = n * (n - 1) // 2
+    lo, hi = world.aabb_min, world.aabb_max
+
+    for i in range(n - 1):
+        #Pudełko i z wszystkimi dalszymi naraz
+        hit = np.all(lo[i] <= hi[i + 1:], axis=1) & np.all(hi[i] >= lo[i + 1:], axis=1)
+        collisions.extend((i, j) for j in (np.flatnonzero(hit) + i + 1).tolist())
+    return collisions, check_count
+
+#Detekcja kolizji Sweep and Prune (sortowanie w osi x a następnie testy)
+def check_collisions_sweep_and_prune(world):
+    lo, hi = world.aabb_min, world.aabb_max
+    min_x = lo[:, 0].tolist()
+    max_x = hi[:, 0].tolist()
+    active = []  #Lista id pudełek
+    collisions = []
+    check_count = 0
+
+    for b in np.argsort(lo[:, 0], kind='stable').tolist():  #Po minx
+        #Usuwanie pudełek które kończą się przed bieżącym minx
+        active = [a for a in active if max_x[a] >= min_x[b]]
+
+        #Porównanie z pozostałymi pudełkami
+        if active:
+            check_count += len(active)
+            act = np.array(active)
+            hit = np.all(lo[act] <= hi[b], axis=1) & np.all(hi[act] >= lo[b], axis=1)
+            collisions.extend((a, b) for a in act[hit].tolist())
+        active.append(b)    #Pudełko z tej pętli może kolidować z innymi (bo spr tylko do mniejszego minx tzn tych z stworzonego wcześneij active)
+    return collisions, check_count
@@ -0,0 +1,93 @@
+#Pętle przejścia BVH jako jądra do kompilacji Numbą (symulacje.jit); bez Numby zwykły Python,
+#a bvh.py zostaje przy wersjach NumPy. Zgodność obu: python parytet.py
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje import jit
+
+@jit.kernel
+def _overlap(lo, hi, a, b):     #Pokrycie granic a i b we wszystkich osiach (jak aabb_intersect)
+    for k in range(3):
+        if lo[a, k] > hi[b, k] or hi[a, k] < lo[b, k]:
+            return False
+    return True
+
+@jit.kernel
+def _grow(out):     #Podwojenie bufora wyników
+    bigger = np.empty((2 * out.shape[0], 2), dtype=np.int64)
+    bigger[:out.shape[0]] = out
+    return bigger
+
+@jit.kernel
+def bvh_query(left, right, box_id, node_min, node_max, box_min, box_max):
+    #Jak find_collisions_bvh dla każdego pudełka: zejście w głąb (lewe przed prawym) na jawnym stosie
+    out = np.empty((max(16, 2 * box_min.shape[0]), 2), dtype=np.int64)
+    count = 0
+    checks = 0
+    stack = np.empty(len(left), dtype=np.int64)
+    for q in range(box_min.shape[0]):
+        stack[0] = 0
+        top = 1
+        while top > 0:
+            top -= 1
+            node = stack[top]
+            checks += 1
+            overlap = True
+            for k in range(3):
+                if box_min[q, k] > node_max[node, k] or box_max[q, k] < node_min[node, k]:
+                    overlap = False
+                    break
+            if not overlap:
+                continue
+            if box_id[node] != -1:
+                if box_id[node] != q:
+                    if count == out.shape[0]:
+                        out = _grow(out)
+                    out[count, 0] = q
+                    out[count, 1] = box_id[node]
+                    count += 1
+                continue
+            stack[top] = right[node]
+            stack[top + 1] = left[node]
+            top += 2
+    return out[:count], checks
+
+@jit.kernel
+def bvh_pairs(left, right, box_id, inner, node_min, node_max, area):
+    #Jak check_collisions_bvh_pairs: pary węzłów od (lewe, prawe) każdego węzła wewnętrznego,
+    #ale para po parze na jawnym stosie zamiast paczek
+    out = np.empty((1024, 2), dtype=np.int64)
+    count = 0
+    checks = 0
+    stack_a = np.empty(len(left), dtype=np.int64)
+    stack_b = np.empty(len(left), dtype=np.int64)
+    for node in inner:
+        stack_a[0] = left[node]
+        stack_b[0] = right[node]
+        top = 1
+        while top > 0:
+            top -= 1
+            a = stack_a[top]
+            b = stack_b[top]
+            checks += 1
+            if not _overlap(node_min, node_max, a, b):
+                continue
+            leaf_a = box_id[a] >= 0
+            leaf_b = box_id[b] >= 0
+            if leaf_a and leaf_b:
+                if count == out.shape[0]:
+                    out = _grow(out)
+                out[count, 0] = box_id[a]
+                out[count, 1] = box_id[b]
+                count += 1
+            elif not leaf_a and (leaf_b or area[a] >= area[b]):     #Dzielę węzeł o większej powierzchni
+                stack_a[top], stack_b[top] = left[a], b
+                stack_a[top + 1], stack_b[top + 1] = right[a], b
+                top += 2
+            else:
+                stack_a[top], stack_b[top] = a, left[b]
+                stack_a[top + 1], stack_b[top + 1] = a, right[b]
+                top += 2
+    return out[:count], checks
@@ -0,0 +1,63 @@
+#Zgodność jąder przejścia BVH (jadra.py) z wersjami NumPy z bvh.py: python parytet.py
+#Bez Numby jądra liczone jako zwykły Python - sprawdza to samą logikę, bez kompilacji
+import argparse
+import sys
+import time
+import numpy as np
+
+import jadra
+from swiat import BoxWorld
+from bvh import create_bvh, check_collisions_bvh, check_collisions_bvh_pairs
+from benchmark import pair_key
+
+def numpy_path(func, *args):    #Wersja NumPy niezależnie od przełącznika
+    enabled = jadra.jit.enabled()
+    jadra.jit.use_jit(False)
+    try:
+        t = time.perf_counter()
+        result = func(*args)
+        return result, time.perf_counter() - t
+    finally:
+        jadra.jit.use_jit(enabled)
+
+def check(world):
+    bvh = create_bvh(world)
+    ext = bvh.a_max - bvh.a_min
+    area = ext[:, 0] * ext[:, 1] + ext[:, 1] * ext[:, 2] + ext[:, 2] * ext[:, 0]
+    rows = []
+
+    (expected, expected_checks), numpy_time = numpy_path(check_collisions_bvh_pairs, bvh)
+    t = time.perf_counter()
+    found, checks = jadra.bvh_pairs(bvh.left, bvh.right, bvh.box_id, bvh.inner, bvh.a_min, bvh.a_max, area)
+    rows.append(('bvh', expected, expected_checks, numpy_time, found, checks, time.perf_counter() - t))
+
+    (expected, expected_checks), numpy_time = numpy_path(check_collisions_bvh, world, bvh)
+    t = time.perf_counter()
+    found, checks = jadra.bvh_query(bvh.left, bvh.right, bvh.box_id, bvh.a_min, bvh.a_max,
+                                    world.aabb_min, world.aabb_max)
+    rows.append(('bvh_query', expected, expected_checks, numpy_time, found, checks, time.perf_counter() - t))
+    return rows
+
+def main():
+    parser = argparse.ArgumentParser(description='Zgodność jąder Numba dla BVH ze ścieżką NumPy')
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 1000, 5000])
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    print(f"Numba: {'tak' if jadra.jit.AVAILABLE else 'nie (jądra jako zwykły Python)'}")
+    failed = False
+    for count in args.counts:
+        for distribution in ('uniform', 'clustered'):
+            world = BoxWorld.random(count, seed=args.seed, distribution=distribution)
+            for name, expected, expected_checks, numpy_time, found, checks, kernel_time in check(world):
+                #Ta sama kolejność wyników w bvh_query, w bvh ten sam zbiór par
+                same = pair_key(expected) == pair_key(found) and checks == expected_checks
+                if name == 'bvh_query':
+                    same &= [tuple(p) for p in np.asarray(found).tolist()] == [tuple(p) for p in expected]
+                failed |= not same
+                print(f"{name:>9} N={count:5d} {distribution:>9}: pary {len(found):6d}, testy {checks:8d} "
+                      f"{'OK' if same else 'BŁĄD'}  NumPy {numpy_time * 1000:.1f} ms, jądro {kernel_time * 1000:.1f} ms")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,64 @@
+#Faza wąska i reakcja na kolizję dla par z dowolnego detektora - wszystkie pary naraz
+import os
+import sys
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje.profil import profiler
+
+def narrow_phase(world, collisions):
+    #Oś i głębokość przenikania dla każdej pary AABB
+    pairs = np.asarray(collisions, dtype=np.int64).reshape(-1, 2)
+    pairs = np.unique(np.sort(pairs, axis=1), axis=0)   #bvh_query zwraca pary podwójnie
+    a, b = pairs[:, 0], pairs[:, 1]
+    d = world.pos[b] - world.pos[a]
+    overlap = world.half[a] + world.half[b] - np.abs(d)    #Przenikanie w każdej osi
+    axis = np.argmin(overlap, axis=1)   #Najmniejsze przenikanie - kierunek rozsunięcia
+    rows = np.arange(len(pairs))
+    depth = overlap[rows, axis]
+    inside = depth > 0  #Sam styk nie wymaga reakcji
+    a, b, axis, depth, rows = a[inside], b[inside], axis[inside], depth[inside], rows[inside]
+    sign = np.where(d[rows, axis] < 0, -1.0, 1.0)   #Normalna od a do b
+    return a, b, axis, sign, depth
+
+#Wymiana pędu wzdłuż normalnej i rozsunięcie ważone masami, kontakty sumowane metodą Jacobiego
+def resolve_collisions(world, collisions, restitution=1.0, iterations=1):
+    if len(collisions) == 0:
+        return 0
+    n = len(world)
+    inv_mass = 1.0 / np.prod(2.0 * world.half, axis=1)    #Masa proporcjonalna do objętości
+    with profiler.section('narrow_phase'):
+        a, b, axis, sign, depth = narrow_phase(world, collisions)
+    contacts = len(a)
+
+    #Impuls tylko dla par zbliżających się do siebie; sumy na ciało i oś bez pętli po parach.
+    #Impuls pary dzielony przez większą z liczb kontaktów obu ciał (bez tego ciało z wieloma kontaktami
+    #dostaje za duży impuls) - oba ciała dostają ten sam impuls z przeciwnym znakiem, pęd zachowany
+    vn = (world.vel[b, axis] - world.vel[a, axis]) * sign
+    impulse = np.where(vn < 0, -(1.0 + restitution) * vn / (inv_mass[a] + inv_mass[b]), 0.0)
+    count = contact_count(a, b, n)
+    impulse /= np.maximum(count[a], count[b])
+    dv = (np.bincount(a * 3 + axis, -impulse * inv_mass[a] * sign, minlength=3 * n)
+          + np.bincount(b * 3 + axis, impulse * inv_mass[b] * sign, minlength=3 * n))
+    world.vel += dv.reshape(n, 3).astype(world.vel.dtype)
+
+    for it in range(iterations):
+        if it > 0:
+            with profiler.section('narrow_phase'):
+                a, b, axis, sign, depth = narrow_phase(world, collisions)
+        if len(a) == 0:
+            break
+        #Lżejsze pudełko przesuwa się bardziej
+        wa = inv_mass[a] / (inv_mass[a] + inv_mass[b])
+        dx = (np.bincount(a * 3 + axis, -wa * depth * sign, minlength=3 * n)
+              + np.bincount(b * 3 + axis, (1.0 - wa) * depth * sign, minlength=3 * n))
+        world.pos += jacobi_average(dx, a, b, n)
+        world.rewrap()  #Rozsunięcie może wypchnąć pudełko za brzeg świata
+    return contacts
+
+def contact_count(a, b, n):     #Liczba kontaktów każdego ciała
+    return np.bincount(np.concatenate((a, b)), minlength=n)
+
+def jacobi_average(delta, a, b, n):     #Suma poprawek ciała (3N,) podzielona przez liczbę jego kontaktów
+    count = contact_count(a, b, n)
+    return (delta.reshape(n, 3) / np.maximum(count, 1)[:, None]).astype(np.float32)
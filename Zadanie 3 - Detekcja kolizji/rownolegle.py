@@ -0,0 +1,79 @@
+#Równoległa detekcja: świat dzielony na warstwy w osi x, każda warstwa w osobnym procesie
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+import numpy as np
+
+from swiat import BoxWorld, max_box_size
+
+_shared = {}    #Widoki na pamięć współdzieloną w procesie roboczym
+
+def _attach(name, n):
+    shm = shared_memory.SharedMemory(name=name)
+    _shared['shm'] = shm    #Trzymam referencję, żeby bufor nie został zwolniony
+    _shared['data'] = np.ndarray((2, n, 3), dtype=np.float32, buffer=shm.buf)
+
+def _detect_slab(algorithm, x0, x1, margin, size):
+    from symulacja import Simulation     #Import w procesie roboczym (unika cyklu symulacja <-> rownolegle)
+    t = time.perf_counter()
+    pos, half = _shared['data']
+    #Pudełka, które mogą mieć parę należącą do tej warstwy
+    sel = np.flatnonzero((pos[:, 0] >= x0 - margin) & (pos[:, 0] < x1 + margin))
+    sub = BoxWorld(pos[sel], np.zeros((len(sel), 3)), half[sel], np.zeros((len(sel), 3)), size)
+    collisions, checks = Simulation(sub, algorithm, bvh_refit=False).detect()
+    pairs = sel[np.asarray(collisions, dtype=np.int64).reshape(-1, 2)]
+
+    #Para należy do warstwy, w której leży początek części wspólnej w osi x - każda para w jednej warstwie
+    start = np.maximum(pos[pairs[:, 0], 0] - half[pairs[:, 0], 0], pos[pairs[:, 1], 0] - half[pairs[:, 1], 0])
+    pairs = pairs[(start >= x0) & (start < x1)]
+    return pairs, checks, time.perf_counter() - t, len(sel), os.getpid()
+
+class ParallelDetector:
+    def __init__(self, workers=None, margin=max_box_size):
+        self.workers = workers or os.cpu_count()
+        self.margin = margin    #Zakładka warstw - co najmniej największe pudełko
+        self.pool = None
+        self.shm = None
+        self.data = None
+        self.timings = []   #Dla każdej warstwy: czas [s], liczba pudełek, pid procesu
+
+    def start(self, n):
+        self.close()
+        self.shm = shared_memory.SharedMemory(create=True, size=max(2 * n * 3 * 4, 1))
+        self.data = np.ndarray((2, n, 3), dtype=np.float32, buffer=self.shm.buf)
+        self.pool = ProcessPoolExecutor(self.workers, initializer=_attach, initargs=(self.shm.name, n))
+
+    def detect(self, world, algorithm):
+        n = len(world)
+        if self.data is None or self.data.shape[1] != n:
+            self.start(n)
+        self.data[0] = world.pos
+        self.data[1] = world.half
+        margin = max(self.margin, float(2 * world.half.max()) if n else 0.0)
+
+        #Granice warstw z kwantyli - podobna liczba pudełek w każdej; skrajne warstwy bez ograniczenia
+        bounds = np.quantile(world.pos[:, 0], np.linspace(0, 1, self.workers + 1)) if n else np.zeros(self.workers + 1)
+        bounds[0], bounds[-1] = -np.inf, np.inf
+        futures = [self.pool.submit(_detect_slab, algorithm, bounds[k], bounds[k + 1], margin, world.size)
+                   for k in range(self.workers) if bounds[k] < bounds[k + 1]]
+
+        results = [f.result() for f in futures]
+        self.timings = [{'time': r[2], 'boxes': r[3], 'pid': r[4]} for r in results]
+        pairs = np.concatenate([r[0] for r in results]) if results else np.empty((0, 2), dtype=np.int64)
+        pairs = np.unique(np.sort(pairs, axis=1), axis=0)   #Scalanie i usuwanie duplikatów
+        return pairs, sum(r[1] for r in results)
+
+    def imbalance(self):    #Najwolniejsza warstwa względem średniej
+        times = [t['time'] for t in self.timings]
+        return max(times) / (sum(times) / len(times)) if times else 1.0
+
+    def close(self):
+        if self.pool is not None:
+            self.pool.shutdown()
+            self.pool = None
+        if self.shm is not None:
+            self.data = None
+            self.shm.close()
+            self.shm.unlink()
+            self.shm = None
@@ -0,0 +1,53 @@
+#Rysowanie wszystkich pudełek jednym wywołaniem glDrawArrays z buforów VBO
+import numpy as np
+from OpenGL.GL import *
+
+#Wspólna siatka sześcianu jednostkowego [-1,1]^3: 6 ścian po 4 wierzchołki
+_corners = np.array([(-1, -1, -1), (1, -1, -1), (1, 1, -1), (-1, 1, -1),
+                     (-1, -1, 1), (1, -1, 1), (1, 1, 1), (-1, 1, 1)], dtype=np.float32)
+_faces = [(0, 1, 2, 3), (4, 5, 6, 7), (0, 1, 5, 4), (2, 3, 7, 6), (1, 2, 6, 5), (0, 3, 7, 4)]
+_face_normals = [(0, 0, -1), (0, 0, 1), (0, -1, 0), (0, 1, 0), (1, 0, 0), (-1, 0, 0)]
+UNIT_CUBE = _corners[np.array(_faces).ravel()]     #(24,3)
+UNIT_NORMALS = np.repeat(np.array(_face_normals, dtype=np.float32), 4, axis=0)
+COLLISION_COLOR = np.array((1.0, 0.2, 0.0), dtype=np.float32)  #Czerwony
+
+class BoxRenderer:
+    def __init__(self):
+        self.vertex_vbo, self.normal_vbo, self.color_vbo = glGenBuffers(3)
+        self.count = -1     #Liczba pudełek, dla której są wgrane normalne
+
+    def upload(self, vbo, data, usage):
+        glBindBuffer(GL_ARRAY_BUFFER, vbo)
+        glBufferData(GL_ARRAY_BUFFER, data.nbytes, data, usage)
+
+    def draw(self, world):
+        n = len(world)
+        if n == 0:
+            return
+        if n != self.count:     #Normalne zależą tylko od liczby pudełek
+            self.upload(self.normal_vbo, np.tile(UNIT_NORMALS, (n, 1)), GL_STATIC_DRAW)
+            self.count = n
+
+        #Przesunięcie i skala każdego pudełka nałożone na wspólną siatkę naraz dla wszystkich
+        vertices = world.pos[:, None, :] + UNIT_CUBE[None, :, :] * world.half[:, None, :]
+        colors = np.where(world.colliding[:, None], COLLISION_COLOR, world.color)
+        self.upload(self.vertex_vbo, np.ascontiguousarray(vertices, dtype=np.float32), GL_STREAM_DRAW)
+        self.upload(self.color_vbo, np.ascontiguousarray(np.repeat(colors, 24, axis=0), dtype=np.float32), GL_STREAM_DRAW)
+
+        glEnableClientState(GL_VERTEX_ARRAY)
+        glEnableClientState(GL_NORMAL_ARRAY)
+        glEnableClientState(GL_COLOR_ARRAY)     #Kolor steruje materiałem (GL_COLOR_MATERIAL)
+        glBindBuffer(GL_ARRAY_BUFFER, self.vertex_vbo)
+        glVertexPointer(3, GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.normal_vbo)
+        glNormalPointer(GL_FLOAT, 0, None)
+        glBindBuffer(GL_ARRAY_BUFFER, self.color_vbo)
+        glColorPointer(3, GL_FLOAT, 0, None)
+        glDrawArrays(GL_QUADS, 0, 24 * n)
+        glBindBuffer(GL_ARRAY_BUFFER, 0)
+        glDisableClientState(GL_COLOR_ARRAY)
+        glDisableClientState(GL_NORMAL_ARRAY)
+        glDisableClientState(GL_VERTEX_ARRAY)
+
+    def close(self):
+        glDeleteBuffers(3, [self.vertex_vbo, self.normal_vbo, self.color_vbo])
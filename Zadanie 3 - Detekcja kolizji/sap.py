@@ -0,0 +1,148 @@
+#Sweep and Prune z pamięcią między klatkami: posortowane końce przedziałów na 3 osiach
+#Zysk względem sweep_static rośnie z koherencją ruchu: koszt to liczba zamian końców (prędkość razy gęstość),
+#przy bardzo szybkim ruchu w gęstych skupiskach (v=5, N=20000 clustered) oba są porównywalne
+import numpy as np
+
+from detektory import check_collisions_sweep_and_prune
+
+class SweepAndPrune:
+    def __init__(self, chunk=1 << 20):
+        self.box = None     #Dla każdej osi: id pudełka kolejnych końców przedziałów (2N,)
+        self.is_max = None  #Dla każdej osi: czy koniec to max (True) czy min (False)
+        self.keys = None    #Pary (i, j), i < j, nachodzące na siebie na wszystkich osiach jako posortowane i*N + j
+        self.n = 0
+        self.checks = 0
+        self.chunk = chunk  #Ile zamian końców naraz - ogranicza pamięć
+
+    def reset(self, world):
+        n = self.n = len(world)
+        ids = np.concatenate((np.arange(n), np.arange(n)))
+        is_max = np.concatenate((np.zeros(n, dtype=bool), np.ones(n, dtype=bool)))
+        self.box, self.is_max = [], []
+        for axis in range(3):
+            vals = np.concatenate((world.aabb_min[:, axis], world.aabb_max[:, axis]))
+            order = np.lexsort((is_max, vals))  #Przy równych wartościach min przed max (styk to kolizja)
+            self.box.append(ids[order])
+            self.is_max.append(is_max[order])
+        collisions, self.checks = check_collisions_sweep_and_prune(world)
+        self.keys = self.pair_keys(np.asarray(collisions, dtype=np.int64).reshape(-1, 2))
+
+    def pair_keys(self, pairs):     #Pary (M,2) w dowolnej kolejności -> posortowane unikalne klucze
+        a, b = pairs[:, 0], pairs[:, 1]
+        return np.unique(np.minimum(a, b) * self.n + np.maximum(a, b))
+
+    def update(self, world):
+        if self.box is None or len(self.box[0]) != 2 * len(world):
+            self.reset(world)
+            return self.collisions(), self.checks
+
+        lo, hi = world.aabb_min, world.aabb_max
+        self.checks = 0
+        #Pudełka, które przeskoczyły przez brzeg, wyjmuję z list - sortowanie przesuwałoby je
+        #przez cały świat - i wstawiam ponownie po posortowaniu reszty
+        wrapped = np.flatnonzero(world.wrapped)
+        if len(wrapped):
+            gone = world.wrapped
+            self.keys = self.keys[~(gone[self.keys // self.n] | gone[self.keys % self.n])]
+            for axis in range(3):
+                keep = ~gone[self.box[axis]]
+                self.box[axis] = self.box[axis][keep]
+                self.is_max[axis] = self.is_max[axis][keep]
+
+        started = []    #Pary, które zaczęły nachodzić na siebie na którejś osi
+        for axis in range(3):
+            self.sort_axis(axis, lo, hi, started)
+        #Pary, które przestały nachodzić na którejś osi, odpadają w teście na nowych granicach -
+        #par jest zwykle dużo mniej niż zamian max przed min, więc to tańsze niż odejmowanie zbiorów
+        self.keys = self.keys[self.overlap(self.keys, lo, hi)]
+        self.checks += len(self.keys)
+
+        found = []
+        if len(wrapped):
+            for axis in range(3):
+                self.insert(axis, wrapped, lo, hi)
+            found.append(self.wrapped_pairs(wrapped, lo, hi))
+
+        if started:     #Test pełnych AABB dla kandydatów na końcu, na ostatecznych granicach
+            cand = np.concatenate(started)
+            self.checks += len(cand)
+            found.append(cand[self.overlap(cand, lo, hi)])
+        if found:
+            self.keys = np.union1d(self.keys, np.concatenate(found))
+        return self.collisions(), self.checks
+
+    def overlap(self, keys, lo, hi):    #Czy pary o kluczach keys nachodzą na siebie na wszystkich osiach
+        a, b = keys // self.n, keys % self.n
+        return np.all(lo[a] <= hi[b], axis=1) & np.all(hi[a] >= lo[b], axis=1)
+
+    def values(self, axis, lo, hi):
+        box = self.box[axis]
+        return np.where(self.is_max[axis], hi[box, axis], lo[box, axis])
+
+    #Zamiany końców to zmiany nakładania. Zamienione są dokładnie pary odwrócone między starą
+    #a nową kolejnością (inwersje) - te same, które przeszłoby sortowanie przez wstawianie, ale
+    #bez pętli po końcach. Przy spójnym ruchu inwersji jest niewiele, prawie O(N)
+    def sort_axis(self, axis, lo, hi, started):
+        vals = self.values(axis, lo, hi)
+        if len(vals) < 2:
+            return
+        box, is_max = self.box[axis], self.is_max[axis]
+        #Przy równych wartościach min przed max, poza tym stara kolejność (jak stabilne wstawianie)
+        order = np.lexsort((np.arange(len(vals)), is_max, vals))
+        rank = np.empty_like(order)
+        rank[order] = np.arange(len(order))
+        prefix = np.maximum.accumulate(rank)
+        moved = np.flatnonzero(rank < prefix)   #Końce, które wyprzedziły jakiś wcześniejszy
+        if len(moved) == 0:
+            return
+        #Partnerzy końca j to wcześniejsze końce o wyższej nowej pozycji, wszystkie w [first[j], j)
+        first = np.searchsorted(prefix, rank[moved], side='right')
+        width = moved - first
+        ends = np.cumsum(width)
+        k = 0
+        while k < len(moved):   #Paczki po ok. chunk par
+            last = max(int(np.searchsorted(ends, (ends[k - 1] if k else 0) + self.chunk, side='right')), k + 1)
+            rep = width[k:last]
+            j = np.repeat(moved[k:last], rep)
+            i = np.repeat(first[k:last], rep) + np.arange(len(j)) - np.repeat(np.cumsum(rep) - rep, rep)
+            swap = rank[i] > rank[j]
+            i, j = i[swap], j[swap]
+            bi, bj = box[i], box[j]
+            key = np.minimum(bi, bj) * self.n + np.maximum(bi, bj)
+            other = bi != bj    #Max przechodzący przed min kończy nakładanie - sprawdzane testem par w update
+            started.append(key[other & is_max[i] & ~is_max[j]])     #min przechodzi przed max innego pudełka
+            k = last
+        self.box[axis] = box[order]
+        self.is_max[axis] = is_max[order]
+
+    def wrapped_pairs(self, wrapped, lo, hi):
+        #Nowi sąsiedzi przeniesionych pudełek: kandydaci z przedziału w osi x (pudełka posortowane po min x,
+        #min nie dalej niż najszersze pudełko przed min przeniesionego), potem test pełnych AABB
+        by_lo = np.argsort(lo[:, 0], kind='stable')
+        sorted_lo = lo[by_lo, 0]
+        reach = float((hi[:, 0] - lo[:, 0]).max())
+        first = np.searchsorted(sorted_lo, lo[wrapped, 0] - reach, side='left')
+        rep = np.searchsorted(sorted_lo, hi[wrapped, 0], side='right') - first
+        a = np.repeat(wrapped, rep)
+        b = by_lo[np.repeat(first, rep) + np.arange(len(a)) - np.repeat(np.cumsum(rep) - rep, rep)]
+        other = a != b
+        a, b = a[other], b[other]
+        self.checks += len(a)
+        hit = np.all(lo[a] <= hi[b], axis=1) & np.all(hi[a] >= lo[b], axis=1)
+        return np.minimum(a[hit], b[hit]) * self.n + np.maximum(a[hit], b[hit])
+
+    def insert(self, axis, ids, lo, hi):
+        vals = self.values(axis, lo, hi)
+        new_vals = np.concatenate((lo[ids, axis], hi[ids, axis]))
+        new_max = np.concatenate((np.zeros(len(ids), dtype=bool), np.ones(len(ids), dtype=bool)))
+        order = np.lexsort((new_max, new_vals))     #Wstawiane końce w tym samym miejscu też muszą być posortowane
+        new_ids = np.concatenate((ids, ids))[order]
+        new_vals, new_max = new_vals[order], new_max[order]
+        #min na lewo od równych wartości, max na prawo - styk dalej liczy się jako nakładanie
+        at = np.where(new_max, np.searchsorted(vals, new_vals, side='right'),
+                      np.searchsorted(vals, new_vals, side='left'))
+        self.box[axis] = np.insert(self.box[axis], at, new_ids)
+        self.is_max[axis] = np.insert(self.is_max[axis], at, new_max)
+
+    def collisions(self):
+        return np.stack((self.keys // self.n, self.keys % self.n), axis=1)
@@ -0,0 +1,77 @@
+#Detekcja kolizji na jednorodnej siatce (spatial hash) z kołowymi warunkami brzegowymi
+import itertools
+import numpy as np
+
+from swiat import max_box_size
+
+class UniformGrid:
+    def __init__(self, cell_size=None, chunk=1 << 20):
+        #Komórka nie mniejsza niż największe pudełko - wystarczą sąsiednie komórki. None - dokładnie
+        #największe pudełko świata (max_box_size tylko dla pustego świata), liczba - co najmniej tyle
+        self.cell_size = cell_size
+        self.chunk = chunk  #Ile par kandydatów sprawdzam naraz (ogranicza pamięć)
+
+    def cells(self, world):
+        #Liczba komórek na oś tak, by komórka miała co najmniej cell_size
+        largest = float(2 * world.half.max()) if len(world) else max_box_size
+        cell_size = largest if self.cell_size is None else max(self.cell_size, largest)
+        dims = max(int(world.size // cell_size), 1)
+        cell = world.size / dims
+        idx = np.floor((world.pos + world.size / 2.0) / cell).astype(np.int64)
+        idx %= dims     #Pudełko dokładnie na brzegu trafia do komórki po drugiej stronie, jak w BoxWorld.step
+        return idx, dims
+
+    def build(self, world):
+        idx, dims = self.cells(world)
+        cell_id = (idx[:, 0] * dims + idx[:, 1]) * dims + idx[:, 2]
+
+        #Sortowanie przez zliczanie: pudełka z komórki c to order[start[c]:start[c] + count[c]]
+        self.count = np.bincount(cell_id, minlength=dims ** 3)
+        self.start = np.concatenate(([0], np.cumsum(self.count)[:-1]))
+        self.order = np.argsort(cell_id, kind='stable')
+        self.idx, self.dims = idx, dims
+
+    def find_collisions(self, world):
+        self.build(world)
+        return self.query(world)
+
+    def query(self, world):
+        n = len(world)
+        if n < 2:
+            return np.empty((0, 2), dtype=np.int64), 0
+        idx, dims = self.idx, self.dims
+        count, start, order = self.count, self.start, self.order
+
+        #Sąsiedzi z zawijaniem. Przy co najmniej 3 komórkach na oś wystarczy połowa otoczenia
+        #(13 przesunięć "do przodu" + własna komórka), przy 1-2 przesunięcia -1 i +1 wskazują
+        #tę samą komórkę, więc biorę różne komórki i filtr i < j
+        if dims >= 3:
+            shifts = [d for d in itertools.product((-1, 0, 1), repeat=3) if d > (0, 0, 0)]
+        else:
+            shifts = [d for d in itertools.product(sorted({s % dims for s in (-1, 0, 1)}), repeat=3) if d != (0, 0, 0)]
+        lo, hi = world.aabb_min, world.aabb_max
+        found = []
+        check_count = 0
+        for d in [(0, 0, 0)] + shifts:
+            half_shell = dims >= 3 and d != (0, 0, 0)
+            nb = (idx + d) % dims
+            nb_id = (nb[:, 0] * dims + nb[:, 1]) * dims + nb[:, 2]
+            total = count[nb_id]
+            #Kandydaci (i, j) dla każdego i ze wszystkimi j z sąsiedniej komórki, w paczkach
+            ends = np.cumsum(total)
+            first = 0
+            while first < n:
+                last = int(np.searchsorted(ends, ends[first - 1] + self.chunk if first else self.chunk, side='right'))
+                last = max(last, first + 1)
+                rep = total[first:last]
+                i = np.repeat(np.arange(first, last), rep)
+                offset = np.arange(len(i)) - np.repeat(np.cumsum(rep) - rep, rep)
+                j = order[np.repeat(start[nb_id[first:last]], rep) + offset]
+                if not half_shell:  #Każda para raz
+                    keep = i < j
+                    i, j = i[keep], j[keep]
+                check_count += len(i)
+                hit = np.all(lo[i] <= hi[j], axis=1) & np.all(hi[i] >= lo[j], axis=1)
+                found.append(np.stack((i[hit], j[hit]), axis=1))
+                first = last
+        return np.concatenate(found), check_count
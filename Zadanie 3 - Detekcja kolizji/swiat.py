@@ -0,0 +1,83 @@
+#Świat pudełek w układzie "structure of arrays" - bez pygame i OpenGL
+import numpy as np
+
+# Parametry konfiguracji
+box_count = 1000
+world_size = 100.0
+min_box_size = 1.0
+max_box_size = 10.0
+max_speed = 0.7
+bvh_rebuild_threshold = 1.3   #Przebudowa BVH gdy koszt SAH po refit wzrośnie o 30% względem budowy
+
+class BoxWorld:
+    #Wszystkie dane pudełek w ciągłych tablicach (N,3) float32
+    def __init__(self, pos, vel, half, color=None, size=world_size):
+        self.pos = np.ascontiguousarray(pos, dtype=np.float32)
+        self.vel = np.ascontiguousarray(vel, dtype=np.float32)
+        self.half = np.ascontiguousarray(half, dtype=np.float32)   #Połowy wymiarów (szerokość, wysokość, głębokość)
+        self.size = float(size)
+        n = len(self.pos)
+        if color is None:
+            color = np.random.uniform(0.3, 1.0, (n, 3))
+        self.color = np.ascontiguousarray(color, dtype=np.float32)
+        self.colliding = np.zeros(n, dtype=bool)
+        self.wrapped = np.zeros(n, dtype=bool)  #Pudełka przeniesione na drugą stronę świata w ostatnim kroku
+        self.rewrapped = np.zeros(n, dtype=bool)    #Przeniesione po kroku (rewrap) - zostają w wrapped następnego
+        self.aabb_min = np.empty_like(self.pos)    #Granice pudełek liczone raz na klatkę
+        self.aabb_max = np.empty_like(self.pos)
+        self.update_aabb()
+
+    @classmethod
+    def random(cls, count=box_count, size=world_size, min_size=min_box_size, max_size=max_box_size,
+               speed=max_speed, seed=None, distribution='uniform', clusters=8):
+        rng = np.random.default_rng(seed)
+        dims = rng.integers(int(min_size), int(max_size), size=(count, 3), endpoint=True)
+        if distribution == 'uniform':
+            pos = rng.integers(int(-size / 2), int(size / 2), size=(count, 3), endpoint=True)
+        elif distribution == 'clustered':   #Skupiska wokół losowych środków
+            centers = rng.uniform(-size / 3, size / 3, (clusters, 3))
+            pos = centers[rng.integers(0, clusters, count)] + rng.normal(0.0, size / 20, (count, 3))
+            pos = np.clip(pos, -size / 2, size / 2)
+        else:
+            raise ValueError(f"Nieznany rozkład: {distribution}")
+        vel = (rng.random((count, 3)) - 0.5) * speed    #od -0.5 max_speed do 0.5 max_speed
+        color = rng.uniform(0.3, 1.0, (count, 3))
+        return cls(pos, vel, dims / 2.0, color, size)
+
+    def __len__(self):
+        return len(self.pos)
+
+    def copy(self):
+        return BoxWorld(self.pos.copy(), self.vel.copy(), self.half.copy(), self.color.copy(), self.size)
+
+    def update_aabb(self):  #granice pudełek bez alokacji nowych tablic
+        np.subtract(self.pos, self.half, out=self.aabb_min)
+        np.add(self.pos, self.half, out=self.aabb_max)
+
+    def wrap(self):     #Kołowe warunki brzegowe dla wszystkich osi naraz; zwraca maskę przeniesionych pudełek
+        half = np.float32(self.size / 2.0)
+        over = self.pos > half
+        under = self.pos < -half
+        self.pos[over] = -half
+        self.pos[under] = half
+        return np.any(over | under, axis=1)
+
+    def step(self):
+        self.pos += self.vel    #Brak reakcji na kolizję
+        #Przeniesione od poprzedniej detekcji: w tym kroku i przez rewrap po poprzednim
+        np.logical_or(self.wrap(), self.rewrapped, out=self.wrapped)
+        self.rewrapped[:] = False
+        self.update_aabb()
+        self.colliding[:] = False   #Czyszczenie flag kolizji
+
+    def rewrap(self):
+        #Po zmianie położeń poza krokiem (rozsunięcie w reakcji na kolizję): zawinięcie i nowe granice.
+        #Przeniesione pudełka od razu w wrapped i zachowane do następnej detekcji (SaP wyjmuje je z list)
+        moved = self.wrap()
+        self.wrapped |= moved
+        self.rewrapped |= moved
+        self.update_aabb()
+
+#Sprawdzenie przecięcia prostopadłościanów (AABB– Axis-Aligned Bounding Boxes)
+def aabb_intersect(a_min, a_max, b_min, b_max):
+    return np.all(a_min <= b_max) and np.all(a_max >= b_min)    #True/False- do kolizji potrzebujemy pokrycia dla 3 osi
@@ -0,0 +1,109 @@
+#Krok symulacji bez okna: ruch pudełek + wybrany algorytm detekcji
+import os
+import sys
+import time
+import numpy as np
+
+from swiat import BoxWorld
+from bvh import DynamicBVH, create_bvh, check_collisions_bvh, check_collisions_bvh_pairs
+from detektory import check_collisions_bruteforce, check_collisions_sweep_and_prune
+from sap import SweepAndPrune
+from siatka import UniformGrid
+from rownolegle import ParallelDetector
+from reakcja import resolve_collisions
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), '..'))  #Wspólny pakiet symulacje
+from symulacje.profil import profiler
+
+#bvh_query - osobne zapytanie dla każdego pudełka, sweep_static - Sweep and Prune od zera w każdej klatce
+ALGORITHMS = ('bvh', 'sweep', 'bruteforce', 'grid', 'bvh_query', 'sweep_static')
+
+class Simulation:
+    def __init__(self, world=None, algorithm='bvh', bvh_refit=True, rebuild_threshold=None, workers=0,
+                 response=False, restitution=1.0):
+        self.world = world if world is not None else BoxWorld.random()
+        self.algorithm = algorithm
+        self.bvh_refit = bvh_refit  #False - budowa BVH od zera w każdej klatce
+        self.dynamic_bvh = DynamicBVH() if rebuild_threshold is None else DynamicBVH(rebuild_threshold)
+        self.sap = SweepAndPrune()
+        self.grid = UniformGrid()
+        self.workers = workers  #>0 - detekcja w tylu procesach, każdy na swojej warstwie świata
+        self.parallel = None
+        self.collisions = []
+        self.checks = 0
+        self.detect_time = 0.0  #Czas samej detekcji [s]
+        self.build_time = 0.0   #W tym budowa/aktualizacja struktury (BVH, siatka)
+        self.simulate_time = 0.0    #Czas ruchu pudełek [s]
+        self.response = response    #Reakcja na kolizję (rozsunięcie i wymiana pędu)
+        self.restitution = restitution
+        self.contacts = 0
+        self.response_time = 0.0
+
+    def detect(self):
+        world = self.world
+        t1 = time.perf_counter()
+        tb = t1
+        if self.workers:
+            if self.parallel is None or self.parallel.workers != self.workers:
+                if self.parallel is not None:
+                    self.parallel.close()
+                self.parallel = ParallelDetector(self.workers)
+            collisions, checks = self.parallel.detect(world, self.algorithm)
+        elif self.algorithm in ('bvh', 'bvh_query'):
+            bvh = self.dynamic_bvh.update(world) if self.bvh_refit else create_bvh(world)
+            tb = time.perf_counter()
+            if self.algorithm == 'bvh':
+                collisions, checks = check_collisions_bvh_pairs(bvh)
+            else:
+                collisions, checks = check_collisions_bvh(world, bvh)
+        elif self.algorithm == 'sweep':
+            collisions, checks = self.sap.update(world)
+        elif self.algorithm == 'sweep_static':
+            collisions, checks = check_collisions_sweep_and_prune(world)
+        elif self.algorithm == 'grid':
+            self.grid.build(world)
+            tb = time.perf_counter()
+            collisions, checks = self.grid.query(world)
+        elif self.algorithm == 'bruteforce':
+            collisions, checks = check_collisions_bruteforce(world)
+        else:
+            raise ValueError(f"Nieznany algorytm: {self.algorithm}")
+        t2 = time.perf_counter()
+
+        # Oznaczenie kolidujących pudełek
+        if len(collisions):
+            world.colliding[np.asarray(collisions).ravel()] = True
+        self.collisions, self.checks = collisions, checks
+        self.detect_time = t2 - t1
+        self.build_time = tb - t1
+        return collisions, checks
+
+    @property
+    def bvh_refits(self):
+        return self.dynamic_bvh.refits
+
+    @property
+    def bvh_rebuilds(self):
+        return self.dynamic_bvh.rebuilds
+
+    def step(self):
+        t = time.perf_counter()
+        with profiler.section('integrate'):
+            self.world.step()
+        self.simulate_time = time.perf_counter() - t
+        with profiler.section('broad_phase'):
+            collisions, checks = self.detect()
+        profiler.count('pair_checks', checks)
+        profiler.count('pairs', len(collisions))
+        if self.response:
+            t = time.perf_counter()
+            with profiler.section('response'):
+                self.contacts = resolve_collisions(self.world, collisions, self.restitution)
+            self.response_time = time.perf_counter() - t
+            profiler.count('contacts', self.contacts)
+        return collisions, checks
+
+    def close(self):    #Zamyka procesy robocze i pamięć współdzieloną
+        if self.parallel is not None:
+            self.parallel.close()
+            self.parallel = None
@@ -0,0 +1,41 @@
+#Zachowanie pędu w reakcji na kolizję (reakcja.py) dla gęstych scen z wieloma kontaktami: python zachowanie.py
+import argparse
+import sys
+import numpy as np
+
+from swiat import BoxWorld
+from detektory import check_collisions_bruteforce
+from reakcja import resolve_collisions
+
+def momentum(world):    #Masa proporcjonalna do objętości, jak w reakcja.py
+    mass = np.prod(2.0 * world.half.astype(float), axis=1)
+    return (mass[:, None] * world.vel).sum(axis=0)
+
+def check(world, restitution):
+    #Zwraca liczbę kontaktów i zmianę pędu względem skali pędów pojedynczych pudełek
+    collisions, _ = check_collisions_bruteforce(world)
+    before = momentum(world)
+    scale = np.abs(np.prod(2.0 * world.half.astype(float), axis=1)[:, None] * world.vel).sum(axis=0).max()
+    contacts = resolve_collisions(world, collisions, restitution)
+    return contacts, np.abs(momentum(world) - before).max() / scale
+
+def main():
+    parser = argparse.ArgumentParser(description='Zachowanie pędu w resolve_collisions')
+    parser.add_argument('--counts', type=int, nargs='+', default=[500, 2000])
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=1e-5)    #Prędkości we float32
+    args = parser.parse_args()
+
+    failed = False
+    for count in args.counts:
+        for restitution in (1.0, 0.5):
+            world = BoxWorld.random(count, seed=args.seed, distribution='clustered')
+            contacts, error = check(world, restitution)
+            ok = contacts > count and error <= args.tolerance   #Więcej kontaktów niż ciał - ciała z wieloma kontaktami
+            failed |= not ok
+            print(f"N={count:5d} e={restitution:.1f}: kontakty {contacts:6d}, zmiana pędu {error:.2e} "
+                  f"{'OK' if ok else 'BŁĄD'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1 @@
+#Wspólny kod symulacji 2D (Zadanie 1 i 2)
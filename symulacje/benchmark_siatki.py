@@ -0,0 +1,55 @@
+#Porównanie wyszukiwania par: pętla po wszystkich parach, wszystkie pary w numpy i lista komórek
+#Uruchomienie z katalogu głównego: python -m symulacje.benchmark_siatki
+import argparse
+import time
+import numpy as np
+
+from symulacje.siatka import cell_list_pairs, all_pairs
+
+def loop_pairs(pos, radius):    #Jak dotychczasowe pętle for i / for j + collision(b1, b2)
+    pairs = []
+    n = len(pos)
+    for i in range(n):
+        for j in range(i + 1, n):
+            if np.linalg.norm(pos[j] - pos[i]) <= radius[i] + radius[j]:
+                pairs.append((i, j))
+    return pairs
+
+METHODS = {'petla': (loop_pairs, 3000), 'numpy': (all_pairs, 20000), 'siatka': (cell_list_pairs, None)}
+
+def measure(method, pos, radius, repeat):
+    t = time.perf_counter()
+    for _ in range(repeat):
+        method(pos, radius)
+    return (time.perf_counter() - t) / repeat
+
+def main():
+    parser = argparse.ArgumentParser(description="Pomiar wyszukiwania par kolidujących kół")
+    parser.add_argument('--counts', type=int, nargs='+', default=[5, 10, 20, 50, 100, 200, 500, 1000, 2000, 5000, 20000])
+    parser.add_argument('--radius', type=float, default=10.0)
+    parser.add_argument('--width', type=float, default=1000.0)
+    parser.add_argument('--height', type=float, default=500.0)
+    parser.add_argument('--seed', type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    crossover = {}
+    print(f"{'N':>7s}" + ''.join(f"{name:>14s}" for name in METHODS))
+    for n in args.counts:
+        pos = rng.uniform(0, 1, (n, 2)) * [args.width, args.height]
+        radius = np.full(n, args.radius)
+        repeat = max(1, 2000 // max(n, 1))
+        times = {}
+        for name, (method, limit) in METHODS.items():
+            if limit is None or n <= limit:
+                times[name] = measure(method, pos, radius, 1 if name == 'petla' else repeat)
+        print(f"{n:7d}" + ''.join(f"{times[name] * 1000:12.3f}ms" if name in times else f"{'-':>14s}" for name in METHODS))
+        for name in times:  #Pierwsze N, od którego lista komórek jest szybsza
+            if name != 'siatka' and name not in crossover and times['siatka'] < times[name]:
+                crossover[name] = n
+    for name in METHODS:
+        if name != 'siatka':
+            print(f"siatka szybsza od '{name}' od N = {crossover.get(name, 'nie w badanym zakresie')}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+#Brzegi dla symulacje.dyski: każdy ma apply(discs, dt), wołane po ruchu, przed zderzeniami
+import numpy as np
+
+from .pbd import DistanceConstraints, PBDSolver
+
+class Walls:    #Prostokąt [0, size] - odbicie od ścian ze stratą energii
+    def __init__(self, size, restitution=1.0):
+        self.size = np.asarray(size, dtype=float)
+        self.restitution = restitution
+
+    def apply(self, discs, dt):
+        r = discs.r[:, None]
+        low = discs.pos < r
+        high = discs.pos > self.size - r
+        discs.pos[:] = np.where(low, r, np.where(high, self.size - r, discs.pos))
+        discs.v[low | high] *= -self.restitution
+
+class Wire:
+    #Okrąg o środku center poruszany z prędkością velocity: koła rzutowane na okrąg,
+    #prędkość z przesunięcia w kroku plus prędkość drutu (jak keep_on_wire i update_velocity)
+    def __init__(self, center, radius, velocity=(0.0, 0.0)):
+        self.center = np.array(center, dtype=float)
+        self.radius = radius
+        self.velocity = np.array(velocity, dtype=float)
+
+    def move(self, dt):     #Przesunięcie drutu - przed krokiem kół
+        self.center += self.velocity * dt
+
+    def apply(self, discs, dt):
+        delta = discs.pos - self.center    #wektor od środka okręgu do koła
+        dist = np.linalg.norm(delta, axis=1, keepdims=True)
+        discs.pos += delta / dist * (self.radius - dist)    #przesunięcie koła na okrąg
+        discs.update_velocity(dt, self.velocity)
+
+class CenterWire:
+    #Koła beads na okręgu wokół ciała center jako więzy odległości (wzór 10, solver PBD);
+    #ciało center przesuwają tylko więzy, jego prędkość się nie zmienia
+    def __init__(self, center, beads, radius, inv_mass, iterations=1, method='gauss_seidel'):
+        self.beads = np.asarray(beads, dtype=np.int64)
+        self.constraints = DistanceConstraints.wire(center, self.beads, radius)
+        self.solver = PBDSolver(inv_mass, iterations, method)
+
+    def apply(self, discs, dt):
+        self.solver.solve(discs.pos, self.constraints, dt)
+        discs.update_velocity(dt, mask=self.beads)
+
+class Periodic:
+    #Świat zawinięty: koło wychodzące jedną stroną wraca drugą. Zderzenia przez szew liczy
+    #dyski.step(..., period=size) - sąsiednie komórki zawinięte, odległości najmniejszego obrazu
+    def __init__(self, size):
+        self.size = np.asarray(size, dtype=float)
+
+    def apply(self, discs, dt):
+        shift = np.floor(discs.pos / self.size) * self.size
+        discs.pos -= shift
+        discs.prev_pos -= shift     #Przesunięcie w kroku bez skoku o szerokość świata
@@ -0,0 +1,181 @@
+#Fizyka sztywnych kół 2D dla scen z Zadań 1 i 2: stan w tablicach, zderzenia całymi paczkami par
+import numpy as np
+
+from . import jit
+from .pbd import disjoint_batches
+from .profil import profiler
+from .siatka import cell_list_pairs, minimum_image
+
+class Discs:
+    #Położenia i prędkości (N,2), promienie i masy (N,); masa domyślnie z pola koła
+    def __init__(self, pos, v, r, m=None):
+        self.pos = np.array(pos, dtype=float)
+        self.v = np.array(v, dtype=float)
+        self.r = np.broadcast_to(np.asarray(r, dtype=float), (len(self.pos),)).copy()
+        self.m = np.pi * self.r * self.r if m is None else np.broadcast_to(np.asarray(m, dtype=float), self.r.shape).copy()
+        self.prev_pos = self.pos.copy()
+
+    def __len__(self):
+        return len(self.pos)
+
+    def apply_gravity(self, gravity, dt, mask=None):    #mask - tylko wybrane ciała
+        if mask is None:
+            self.v += gravity * dt
+        else:
+            self.v[mask] += gravity * dt
+
+    def move(self, dt, drag=0.0):   #drag - ułamek prędkości tracony w kroku (opór powietrza)
+        self.prev_pos[:] = self.pos
+        self.pos += self.v * dt
+        if drag:
+            self.v *= 1 - drag
+
+    def update_velocity(self, dt, offset=0.0, mask=None):   #Prędkość z przesunięcia w kroku (po więzach)
+        if mask is None:
+            self.v = (self.pos - self.prev_pos) / dt + offset
+        else:
+            self.v[mask] = (self.pos[mask] - self.prev_pos[mask]) / dt + offset
+
+    def push(self, point, strength, impulse=True, bodies=None):
+        #Kliknięte koła (punkt wewnątrz) w kierunku od punktu do środka: impuls strength/m albo prędkość strength.
+        #bodies - indeksy albo maska kół, które można pchnąć (None - wszystkie)
+        direction = self.pos - point
+        dist = np.linalg.norm(direction, axis=1)
+        hit = dist <= self.r
+        if bodies is not None:
+            allowed = np.zeros(len(self), dtype=bool)
+            allowed[bodies] = True
+            hit &= allowed
+        direction[dist > 0] /= dist[dist > 0, None]
+        if impulse:
+            self.v[hit] += direction[hit] * (strength / self.m[hit])[:, None]
+        else:
+            self.v[hit] = direction[hit] * strength
+
+    def candidate_pairs(self, bounds=None, bodies=None, periodic=False):
+        #Pary z listy komórek, bodies - tylko wybrane ciała, periodic - świat zawinięty o rozmiarze bounds
+        if bodies is None:
+            return cell_list_pairs(self.pos, self.r, bounds, periodic)
+        i, j = cell_list_pairs(self.pos[bodies], self.r[bodies], bounds, periodic)
+        return bodies[i], bodies[j]
+
+def resolve_pairs(discs, i, j, restitution=1.0, period=None):
+    #Pary w kolejności (i, j) paczkami rozłącznych par - wynik jak przy kolejnych zderzeniach para po parze.
+    #period - rozmiar świata zawiniętego (odległości najmniejszego obrazu), None - bez zawijania
+    resolve_arrays(discs.pos, discs.v, discs.r, discs.m, i, j, restitution, period)
+
+def resolve_arrays(pos, v, r, m, i, j, restitution=1.0, period=None):
+    #To samo na tablicach (N,2) i (N,) zmienianych w miejscu. Z Numbą jedna skompilowana pętla po parach
+    if jit.enabled():
+        collide_sequential(pos, v, r, m, np.asarray(i, dtype=np.int64), np.asarray(j, dtype=np.int64),
+                           float(restitution), kernel_period(period))
+        return
+    for batch in disjoint_batches(i, j, len(pos)):
+        collide(pos, v, r, m, i[batch], j[batch], restitution, period)
+
+def resolve_batched(pos, v, r, m, restitution=1.0):
+    #Zespół B niezależnych scen: pos, v (B,N,2), r, m (B,N). Kandydaci z położeń przed kolizjami
+    #(wszystkie pary sceny), potem para po parze w kolejności (a, b) jak w pętli po parach w skryptach -
+    #każda scena jako osobny fragment spłaszczonych tablic (B*N,2)
+    scenes, n = r.shape
+    a, b = np.triu_indices(n, 1)
+    with profiler.section('broad_phase'):
+        d = pos[:, b] - pos[:, a]
+        candidate = np.einsum('spi,spi->sp', d, d) <= (r[:, a] + r[:, b]) ** 2
+        k, s = np.nonzero(candidate.T)  #Po parach, w parze po scenach
+    profiler.count('pair_checks', candidate.size)
+    profiler.count('pairs', len(k))
+    with profiler.section('response'):
+        flat_pos, flat_v = pos.reshape(-1, 2), v.reshape(-1, 2)    #Widoki, jeśli tablice są ciągłe
+        resolve_arrays(flat_pos, flat_v, r.reshape(-1), m.reshape(-1), s * n + a[k], s * n + b[k], restitution)
+        if not np.shares_memory(flat_pos, pos):
+            pos[...] = flat_pos.reshape(pos.shape)
+        if not np.shares_memory(flat_v, v):
+            v[...] = flat_v.reshape(v.shape)
+
+def kernel_period(period):  #Rozmiar świata dla jądra: zero w osi bez zawijania
+    return np.zeros(2) if period is None else np.broadcast_to(np.asarray(period, dtype=float), (2,)).copy()
+
+def collide(pos, v, r, m, i, j, restitution=1.0, period=None):
+    #Zderzenie rozłącznych par (i, j): wymiana pędu wzdłuż normalnej ważona masami i rozsunięcie po połowie
+    delta_pos = pos[j] - pos[i] #wektor między środkami
+    if period is not None:
+        delta_pos = minimum_image(delta_pos, np.asarray(period, dtype=float))
+    dist = np.linalg.norm(delta_pos, axis=1)
+    hit = (dist > 0) & (dist <= r[i] + r[j])  #pozostałe pary - brak kolizji
+    i, j, delta_pos, dist = i[hit], j[hit], delta_pos[hit], dist[hit]
+
+    n = delta_pos / dist[:, None]    #wektor normalny
+    t = np.column_stack((-n[:, 1], n[:, 0])) #wektor styczny
+
+    #Rzutowanie prędkości na wektory n i t
+    v1, v2 = v[i], v[j]
+    v1n = np.einsum('ij,ij->i', v1, n)
+    v1t = np.einsum('ij,ij->i', v1, t)
+    v2n = np.einsum('ij,ij->i', v2, n)
+    v2t = np.einsum('ij,ij->i', v2, t)
+
+    #Składowe normalne po zderzeniu; restitution=1 - sprężyste, równe masy wymieniają się prędkościami
+    m1, m2 = m[i], m[j]
+    p = m1 * v1n + m2 * v2n
+    new_v1n = (p - restitution * m2 * (v1n - v2n)) / (m1 + m2)
+    new_v2n = (p - restitution * m1 * (v2n - v1n)) / (m1 + m2)
+    v[i] = new_v1n[:, None] * n + v1t[:, None] * t
+    v[j] = new_v2n[:, None] * n + v2t[:, None] * t
+
+    #Zmiana położenia (by koła nie przenikały się)
+    correction = ((r[i] + r[j] - dist) / 2)[:, None] * n
+    pos[i] -= correction
+    pos[j] += correction
+
+@jit.kernel
+def collide_sequential(pos, v, r, m, i, j, restitution, period):
+    #To samo co collide() dla kolejnych par, w jednej pętli - tylko dla kompilacji; period (2,) jak kernel_period
+    for k in range(len(i)):
+        a, b = i[k], j[k]
+        dx = pos[b, 0] - pos[a, 0]
+        dy = pos[b, 1] - pos[a, 1]
+        if period[0] > 0:
+            dx -= period[0] * np.floor(dx / period[0] + 0.5)
+        if period[1] > 0:
+            dy -= period[1] * np.floor(dy / period[1] + 0.5)
+        dist = np.sqrt(dx * dx + dy * dy)
+        if dist == 0 or dist > r[a] + r[b]:
+            continue
+        nx, ny = dx / dist, dy / dist
+        tx, ty = -ny, nx
+        v1n = v[a, 0] * nx + v[a, 1] * ny
+        v1t = v[a, 0] * tx + v[a, 1] * ty
+        v2n = v[b, 0] * nx + v[b, 1] * ny
+        v2t = v[b, 0] * tx + v[b, 1] * ty
+        m1, m2 = m[a], m[b]
+        p = m1 * v1n + m2 * v2n
+        new_v1n = (p - restitution * m2 * (v1n - v2n)) / (m1 + m2)
+        new_v2n = (p - restitution * m1 * (v2n - v1n)) / (m1 + m2)
+        v[a, 0] = new_v1n * nx + v1t * tx
+        v[a, 1] = new_v1n * ny + v1t * ty
+        v[b, 0] = new_v2n * nx + v2t * tx
+        v[b, 1] = new_v2n * ny + v2t * ty
+        c = (r[a] + r[b] - dist) / 2
+        pos[a, 0] -= c * nx
+        pos[a, 1] -= c * ny
+        pos[b, 0] += c * nx
+        pos[b, 1] += c * ny
+
+def step(discs, dt, gravity=None, drag=0.0, boundaries=(), restitution=1.0, bounds=None, gravity_mask=None,
+         colliding=None, period=None):
+    #Pełny krok sceny: grawitacja, ruch, brzegi (symulacje.brzegi) i zderzenia par z listy komórek.
+    #colliding - indeksy ciał biorących udział w zderzeniach (None - wszystkie),
+    #period - rozmiar świata zawiniętego (razem z brzegi.Periodic), zderzenia także przez szew
+    with profiler.section('integrate'):
+        if gravity is not None:
+            discs.apply_gravity(gravity, dt, gravity_mask)
+        discs.move(dt, drag)
+    with profiler.section('constraints'):
+        for boundary in boundaries:
+            boundary.apply(discs, dt)
+    with profiler.section('broad_phase'):
+        i, j = discs.candidate_pairs(bounds if period is None else period, colliding, period is not None)
+    profiler.count('pairs', len(i))
+    with profiler.section('response'):
+        resolve_pairs(discs, i, j, restitution, period)
@@ -0,0 +1,27 @@
+#Opcjonalna kompilacja pętli (Numba). Bez Numby - ścieżka NumPy; jądra zostają zwykłymi funkcjami
+#Pythona, używanymi tylko przez sprawdzenie zgodności (python -m symulacje.parytet).
+#Przełącznik: use_jit(False) w programie albo zmienna środowiskowa SYMULACJE_JIT=0.
+#Skompilowane jądra trafiają do __pycache__ (cache=True) albo do katalogu z NUMBA_CACHE_DIR.
+import os
+
+try:
+    import numba
+except ImportError:
+    numba = None
+
+AVAILABLE = numba is not None
+_enabled = AVAILABLE and os.environ.get('SYMULACJE_JIT', '1') != '0'
+
+def enabled():
+    return _enabled
+
+def use_jit(flag=True):
+    global _enabled
+    if flag and not AVAILABLE:
+        raise RuntimeError('Numba nie jest zainstalowana - dostępna tylko ścieżka NumPy')
+    _enabled = flag
+
+def kernel(func):   #Dekorator jądra: skompilowane z zapisem na dysk albo bez zmian
+    if numba is None:
+        return func
+    return numba.njit(cache=True, nogil=True)(func)
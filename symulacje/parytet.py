@@ -0,0 +1,81 @@
+#Zgodność skompilowanych jąder (symulacje.jit) ze ścieżką NumPy: python -m symulacje.parytet
+#Bez Numby jądra liczone jako zwykły Python - sprawdza to samą logikę, bez kompilacji
+import argparse
+import sys
+import time
+import numpy as np
+
+from . import jit
+from .brzegi import Periodic
+from .dyski import Discs, collide_sequential, kernel_period, resolve_pairs
+from .siatka import all_pairs, cell_list_pairs
+
+def random_discs(count, seed, size=1000.0):
+    rng = np.random.default_rng(seed)
+    pos = rng.uniform(0, size, (count, 2))
+    v = rng.normal(0, 50, (count, 2))
+    r = rng.uniform(5, 25, count)
+    return Discs(pos, v, r)
+
+def check_discs(count, steps, seed, restitution, period=None):
+    #Te same zderzenia obiema ścieżkami, krok po kroku; zwraca największą różnicę i czasy.
+    #period - świat zawinięty (brzegi.Periodic), pary także przez szew
+    a, b = random_discs(count, seed), random_discs(count, seed)
+    wrap = None if period is None else Periodic(period)
+    diff, numpy_time, kernel_time = 0.0, 0.0, 0.0
+    for _ in range(steps):
+        for d in (a, b):
+            d.move(0.05)
+            if wrap is not None:
+                wrap.apply(d, 0.05)
+        i, j = a.candidate_pairs(period, periodic=period is not None)
+        t = time.perf_counter()
+        enabled = jit.enabled()
+        jit.use_jit(False)
+        resolve_pairs(a, i, j, restitution, period)
+        jit.use_jit(enabled)
+        numpy_time += time.perf_counter() - t
+        t = time.perf_counter()
+        collide_sequential(b.pos, b.v, b.r, b.m, i, j, float(restitution), kernel_period(period))
+        kernel_time += time.perf_counter() - t
+        diff = max(diff, np.abs(a.pos - b.pos).max(), np.abs(a.v - b.v).max())
+        b.pos[:], b.v[:] = a.pos, a.v   #Każdy krok z tego samego stanu
+    return diff, numpy_time, kernel_time
+
+def check_periodic_pairs(count, seed, size=1000.0):
+    #Lista komórek w świecie zawiniętym a wszystkie pary z odległością najmniejszego obrazu;
+    #zwraca liczbę par i liczbę par przez szew
+    discs = random_discs(count, seed, size)
+    expected = all_pairs(discs.pos, discs.r, (size, size), periodic=True)
+    found = cell_list_pairs(discs.pos, discs.r, (size, size), periodic=True)
+    same = all(np.array_equal(e, f) for e, f in zip(expected, found))
+    d = discs.pos[found[1]] - discs.pos[found[0]]
+    seam = np.count_nonzero(np.einsum('ij,ij->i', d, d) > (discs.r[found[0]] + discs.r[found[1]]) ** 2)
+    return same, len(found[0]), seam
+
+def main():
+    parser = argparse.ArgumentParser(description='Zgodność jąder Numba ze ścieżką NumPy')
+    parser.add_argument('--counts', type=int, nargs='+', default=[100, 2000])
+    parser.add_argument('--steps', type=int, default=20)
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--tolerance', type=float, default=1e-9)
+    args = parser.parse_args()
+
+    print(f"Numba: {'tak' if jit.AVAILABLE else 'nie (jądra jako zwykły Python)'}")
+    failed = False
+    for count in args.counts:
+        for restitution, period in ((1.0, None), (0.5, None), (1.0, 1000.0)):
+            diff, numpy_time, kernel_time = check_discs(count, args.steps, args.seed, restitution, period)
+            ok = diff <= args.tolerance
+            failed |= not ok
+            world = 'zawinięty' if period else 'otwarty'
+            print(f"koła N={count:6d} e={restitution:.1f} {world:>9}: różnica {diff:.2e} {'OK' if ok else 'BŁĄD'}  "
+                  f"NumPy {numpy_time * 1000:.1f} ms, jądro {kernel_time * 1000:.1f} ms")
+        same, pairs, seam = check_periodic_pairs(count, args.seed)
+        failed |= not same
+        print(f"pary N={count:6d} zawinięty: {pairs} par, {seam} przez szew, zgodne ze wszystkimi parami "
+              f"{'OK' if same else 'BŁĄD'}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,125 @@
+#Solver więzów położeniowych (PBD/XPBD) dla ciał w tablicach (N,2): więzy odległości i kontaktu
+#jako tablice indeksów i parametrów, rozwiązywane paczkami bez wywołań na każdy więz
+import numpy as np
+
+from .profil import profiler
+from .siatka import cell_list_pairs
+
+METHODS = ('gauss_seidel', 'jacobi')
+
+class DistanceConstraints:
+    #|pos[i] - pos[j]| = rest; unilateral - tylko |pos[i] - pos[j]| >= rest (kontakt).
+    #compliance - podatność XPBD (odwrotność sztywności), 0 - więz sztywny
+    def __init__(self, i, j, rest, compliance=0.0, unilateral=False):
+        self.i = np.asarray(i, dtype=np.int64).ravel()
+        self.j = np.asarray(j, dtype=np.int64).ravel()
+        n = len(self.i)
+        self.rest = np.broadcast_to(np.asarray(rest, dtype=float), (n,)).copy()
+        self.compliance = np.broadcast_to(np.asarray(compliance, dtype=float), (n,)).copy()
+        self.unilateral = np.broadcast_to(np.asarray(unilateral, dtype=bool), (n,)).copy()
+        self._batches = None
+
+    def __len__(self):
+        return len(self.i)
+
+    @classmethod
+    def wire(cls, center, beads, radius, compliance=0.0):   #Koraliki na okręgu wokół ciała center (wzór 10)
+        beads = np.asarray(beads, dtype=np.int64)
+        return cls(np.broadcast_to(center, beads.shape), beads, radius, compliance)
+
+    @classmethod
+    def chain(cls, bodies, rest, compliance=0.0):   #Łańcuch: kolejne ciała połączone prętami
+        bodies = np.asarray(bodies, dtype=np.int64)
+        return cls(bodies[:-1], bodies[1:], rest, compliance)
+
+    @classmethod
+    def contacts(cls, pos, radius, bodies=None, compliance=0.0):    #Kontakty kół z listy komórek
+        bodies = np.arange(len(pos)) if bodies is None else np.asarray(bodies, dtype=np.int64)
+        radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(pos),))
+        i, j = cell_list_pairs(np.asarray(pos)[bodies], radius[bodies])
+        i, j = bodies[i], bodies[j]
+        return cls(i, j, radius[i] + radius[j], compliance, unilateral=True)
+
+    @classmethod
+    def concatenate(cls, *constraints):
+        return cls(np.concatenate([c.i for c in constraints]), np.concatenate([c.j for c in constraints]),
+                   np.concatenate([c.rest for c in constraints]),
+                   np.concatenate([c.compliance for c in constraints]),
+                   np.concatenate([c.unilateral for c in constraints]))
+
+    def batches(self, n):   #Paczki więzów bez wspólnych ciał, liczone raz
+        if self._batches is None:
+            self._batches = disjoint_batches(self.i, self.j, n)
+        return self._batches
+
+def disjoint_batches(i, j, n):
+    #Kolorowanie grafu: paczki par (i, j) bez wspólnych ciał. Para trafia do paczki, gdy jest pierwszą
+    #nieprzydzieloną parą obu swoich ciał - kolejne paczki dają ten sam wynik co pętla po parach
+    batches = []
+    left = np.arange(len(i))
+    while len(left):
+        a, b = i[left], j[left]
+        k = np.arange(len(left))
+        first = np.full(n, len(left))
+        np.minimum.at(first, a, k)
+        np.minimum.at(first, b, k)
+        batch = (first[a] == k) & (first[b] == k)
+        batches.append(left[batch])
+        left = left[~batch]
+    return batches
+
+class PBDSolver:
+    #inv_mass: (N,) odwrotności mas, 0 - ciało nieruchome
+    def __init__(self, inv_mass, iterations=1, method='gauss_seidel', relaxation=1.0):
+        if method not in METHODS:
+            raise ValueError(f"Nieznana metoda {method!r}, dostępne: {', '.join(METHODS)}")
+        self.inv_mass = np.asarray(inv_mass, dtype=float)
+        self.iterations = iterations
+        self.method = method
+        self.relaxation = relaxation    #Dla Jacobiego: mnożnik uśrednionej poprawki
+
+    def solve(self, pos, constraints, dt):
+        #Poprawia pos w miejscu; zwraca mnożniki Lagrange'a (siła więzu ~ lambda / dt²)
+        lam = np.zeros(len(constraints))
+        if len(constraints) == 0:
+            return lam
+        alpha = constraints.compliance / (dt * dt)
+        profiler.count('constraint_iterations', self.iterations)
+        for _ in range(self.iterations):
+            if self.method == 'jacobi':
+                self.jacobi(pos, constraints, lam, alpha)
+            else:
+                for batch in constraints.batches(len(pos)):
+                    self.project(pos, constraints, lam, alpha, batch)
+        return lam
+
+    def corrections(self, pos, constraints, lam, alpha, k):
+        #Przyrost mnożnika i kierunek dla więzów k przy obecnych położeniach
+        i, j = constraints.i[k], constraints.j[k]
+        delta = pos[i] - pos[j]
+        dist = np.linalg.norm(delta, axis=1)
+        n = delta / np.where(dist > 0, dist, 1.0)[:, None]
+        wi, wj = self.inv_mass[i], self.inv_mass[j]
+        w = wi + wj + alpha[k]
+        c = dist - constraints.rest[k]
+        dlam = np.where(w > 0, (-c - alpha[k] * lam[k]) / np.where(w > 0, w, 1.0), 0.0)
+        #Kontakt tylko odpycha: łączny mnożnik nie może być ujemny
+        dlam = np.where(constraints.unilateral[k], np.maximum(lam[k] + dlam, 0.0) - lam[k], dlam)
+        lam[k] += dlam
+        return i, j, (wi * dlam)[:, None] * n, (wj * dlam)[:, None] * n
+
+    def project(self, pos, constraints, lam, alpha, batch):     #Gauss-Seidel: paczka rozłącznych więzów
+        i, j, dxi, dxj = self.corrections(pos, constraints, lam, alpha, batch)
+        pos[i] += dxi
+        pos[j] -= dxj
+
+    def jacobi(self, pos, constraints, lam, alpha):
+        #Wszystkie więzy z tych samych położeń, poprawki ciała uśrednione po liczbie jego więzów
+        i, j, dxi, dxj = self.corrections(pos, constraints, lam, alpha, np.arange(len(constraints)))
+        n = len(pos)
+        dx = np.zeros_like(pos)
+        for axis in range(pos.shape[1]):
+            dx[:, axis] = (np.bincount(i, dxi[:, axis], minlength=n) - np.bincount(j, dxj[:, axis], minlength=n))
+        active = (dxi != 0).any(axis=1) | (dxj != 0).any(axis=1)  #Nieaktywne kontakty nie rozcieńczają średniej
+        count = np.bincount(np.concatenate((i[active], j[active])), minlength=n)
+        pos += self.relaxation * dx / np.maximum(count, 1)[:, None]
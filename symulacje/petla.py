@@ -0,0 +1,48 @@
+#Pętla ze stałym krokiem fizyki niezależnym od częstotliwości rysowania
+class FixedStepLoop:
+    #step(h) - przesuwa fizykę o czas h; state() - tablica położeń do interpolacji przy rysowaniu;
+    #on_step(loop) - wołane po każdym pełnym kroku (np. zapis klatki)
+    def __init__(self, step, dt, substeps=1, speed=1.0, state=None, max_steps=8, on_step=None):
+        self.step = step
+        self.dt = dt    #Stały krok fizyki
+        self.substeps = substeps    #Podkroki w jednym kroku (krok h = dt / substeps)
+        self.speed = speed  #Czas symulacji na sekundę czasu rzeczywistego
+        self.state = state
+        self.max_steps = max_steps  #Limit kroków na klatkę, żeby przy przeciążeniu nie nadrabiać w nieskończoność
+        self.on_step = on_step
+        self.accumulator = 0.0
+        self.time = 0.0
+        self.steps = 0
+        self.previous = self.current = state().copy() if state is not None else None
+
+    def tick(self):     #Jeden stały krok fizyki
+        h = self.dt / self.substeps
+        for _ in range(self.substeps):
+            self.step(h)
+        self.time += self.dt
+        self.steps += 1
+        if self.state is not None:
+            self.previous, self.current = self.current, self.state().copy()
+        if self.on_step is not None:
+            self.on_step(self)
+
+    def advance(self, frame_time):
+        #Kroki fizyki należne za frame_time sekund rzeczywistych; zwraca ułamek kroku do interpolacji
+        self.accumulator += frame_time * self.speed
+        done = 0
+        while self.accumulator >= self.dt and done < self.max_steps:
+            self.tick()
+            self.accumulator -= self.dt
+            done += 1
+        if done == self.max_steps:
+            self.accumulator = min(self.accumulator, self.dt)
+        return self.accumulator / self.dt
+
+    def run(self, steps):   #Bez okna i bez czekania - szybciej niż w czasie rzeczywistym
+        for _ in range(steps):
+            self.tick()
+
+    def interpolated(self, alpha):  #Położenia między dwoma ostatnimi krokami fizyki
+        if self.current is None or self.previous.shape != self.current.shape:
+            return self.current
+        return self.previous + (self.current - self.previous) * alpha
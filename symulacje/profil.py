@@ -0,0 +1,127 @@
+#Pomiar czasu nazwanych sekcji i liczniki (pary, kontakty, iteracje więzów) klatka po klatce.
+#Wyłączony profiler kosztuje jedno wywołanie metody na sekcję. Włączenie: profiler.enabled = True
+#albo zmienna środowiskowa SYMULACJE_PROFIL=1. Sekcje mogą się zagnieżdżać - czas wewnętrznej
+#jest wliczony w zewnętrzną, ponowne wejście w sekcję o tej samej nazwie liczy się raz (w najbardziej
+#zewnętrznej). Oś czasu do eksportu tylko z keep_timeline (--profile PLIK), inaczej pamięć rośnie z każdą
+#klatką. Standardowe nazwy: integrate, constraints, broad_phase, narrow_phase, response, render.
+import csv
+import json
+import os
+import time
+from collections import deque
+import numpy as np
+
+class _NullSection:
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        return False
+
+_NULL = _NullSection()
+
+class _Section:     #Jeden obiekt na nazwę, bez alokacji przy każdym wejściu; depth - zagnieżdżenie w samej sobie
+    __slots__ = ('profiler', 'name', 'start', 'depth')
+
+    def __init__(self, profiler, name):
+        self.profiler = profiler
+        self.name = name
+        self.depth = 0
+
+    def __enter__(self):
+        if self.depth == 0:
+            self.start = time.perf_counter()
+        self.depth += 1
+        return self
+
+    def __exit__(self, *exc):
+        self.depth -= 1
+        if self.depth == 0:
+            current = self.profiler.current
+            current[self.name] = current.get(self.name, 0.0) + time.perf_counter() - self.start
+        return False
+
+class Profiler:
+    #window - liczba ostatnich klatek do percentyli; timeline - zapamiętanie wszystkich klatek do eksportu
+    def __init__(self, enabled=False, window=240, timeline=False):
+        self.enabled = enabled
+        self.keep_timeline = timeline
+        self.history = deque(maxlen=window)
+        self.timeline = []
+        self.current = {}   #Sekcje [s] i liczniki bieżącej klatki
+        self.sections = {}  #Nazwy sekcji w kolejności pojawienia się
+        self.counters = {}
+        self.frames = 0
+
+    def section(self, name):
+        if not self.enabled:
+            return _NULL
+        section = self.sections.get(name)
+        if section is None:
+            section = self.sections[name] = _Section(self, name)
+        return section
+
+    def count(self, name, value=1):
+        if self.enabled:
+            self.counters.setdefault(name, None)
+            self.current[name] = self.current.get(name, 0) + value
+
+    def end_frame(self, **tags):    #Zamyka klatkę; tags - dodatkowe kolumny w eksporcie (np. algorytm)
+        if not self.enabled:
+            return
+        frame = self.current
+        self.current = {}
+        self.history.append(frame)
+        if self.keep_timeline:
+            self.timeline.append(dict(tags, frame=self.frames, **frame))
+        self.frames += 1
+
+    def clear_window(self):     #Percentyle od nowa (np. nowy przypadek w benchmarku), oś czasu zostaje
+        self.history.clear()
+
+    def values(self, name):
+        return np.array([frame.get(name, 0) for frame in self.history], dtype=float)
+
+    def percentiles(self, name, q=(50, 95, 99)):    #Sekcje w ms, liczniki bez zmian
+        values = self.values(name) * (1000 if name in self.sections else 1)
+        return np.percentile(values, q) if len(values) else np.zeros(len(q))
+
+    def summary(self):  #{nazwa: {mean, p50, p95, p99, max}} z ostatnich klatek
+        result = {}
+        for name in list(self.sections) + list(self.counters):
+            values = self.values(name) * (1000 if name in self.sections else 1)
+            if len(values):
+                p50, p95, p99 = np.percentile(values, (50, 95, 99))
+                result[name] = dict(mean=values.mean(), p50=p50, p95=p95, p99=p99, max=values.max())
+        return result
+
+    def overlay(self):  #Wiersze tekstu do narysowania na ekranie
+        lines = []
+        for name, s in self.summary().items():
+            if name in self.sections:
+                lines.append(f"{name:>12} {s['p50']:7.2f} / {s['p95']:7.2f} ms")
+            else:
+                lines.append(f"{name:>12} {s['mean']:9.0f}")
+        return lines
+
+    def draw(self, surface, font, pos=(10, 10), color=(0, 0, 0)):    #Nakładka na ekran pygame
+        x, y = pos
+        for line in self.overlay():
+            surface.blit(font.render(line, True, color), (x, y))
+            y += font.get_linesize()
+
+    def export(self, path):     #Oś czasu: .json albo .csv, czasy sekcji w ms
+        rows = [{key: value * 1000 if key in self.sections else value for key, value in frame.items()}
+                for frame in self.timeline]
+        if path.endswith('.json'):
+            with open(path, 'w') as f:
+                json.dump(dict(summary=self.summary(), frames=rows), f, indent=1, default=float)
+        else:
+            fields = list(dict.fromkeys(key for row in rows for key in row))
+            with open(path, 'w', newline='') as f:
+                writer = csv.DictWriter(f, fieldnames=fields)
+                writer.writeheader()
+                writer.writerows(rows)
+
+#Wspólny profiler wszystkich pętli i modułów
+profiler = Profiler(enabled=os.environ.get('SYMULACJE_PROFIL', '0') != '0')
@@ -0,0 +1,77 @@
+#Lista komórek (cell list) 2D: kandydaci do kolizji tylko z sąsiednich komórek
+import numpy as np
+
+#Połowa otoczenia komórki - każda para sąsiednich komórek odwiedzona raz
+HALF_SHELL = ((1, -1), (1, 0), (1, 1), (0, 1))
+
+def cell_list_pairs(pos, radius, bounds=None, periodic=False):
+    #Zwraca tablice indeksów (i, j), i < j, par których środki są bliżej niż suma promieni,
+    #w kolejności jak w pętli po (i, j). bounds=(szerokość, wysokość) okna albo None (z położeń).
+    #periodic - świat [0, bounds) zawinięty: sąsiednie komórki przez szew i odległości najmniejszego obrazu
+    if periodic and bounds is None:
+        raise ValueError('Świat zawinięty wymaga bounds')
+    pos = np.asarray(pos, dtype=float)
+    radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(pos),))
+    n = len(pos)
+    if n < 2:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+
+    cell = max(2 * radius.max(), 1e-9)    #Komórka co najmniej średnicy największego koła
+    if bounds is None:
+        origin = pos.min(axis=0)
+        size = pos.max(axis=0) - origin
+    else:
+        origin = np.zeros(2)
+        size = np.broadcast_to(np.asarray(bounds, dtype=float), (2,))
+    dims = np.maximum((size // cell).astype(np.int64), 1)
+    #Przycięcie do siatki - koła poza oknem trafiają do skrajnych komórek, odległości komórek nie rosną
+    idx = np.clip(((pos - origin) // cell).astype(np.int64), 0, dims - 1)
+    cell_id = idx[:, 0] * dims[1] + idx[:, 1]
+
+    #Sortowanie przez zliczanie: koła z komórki c to order[start[c]:start[c] + count[c]]
+    count = np.bincount(cell_id, minlength=dims[0] * dims[1])
+    start = np.concatenate(([0], np.cumsum(count)[:-1]))
+    order = np.argsort(cell_id, kind='stable')
+
+    found_i, found_j = [], []
+    for dx, dy in ((0, 0),) + HALF_SHELL:
+        nx, ny = idx[:, 0] + dx, idx[:, 1] + dy
+        if periodic:
+            nx, ny = nx % dims[0], ny % dims[1]
+        valid = (nx >= 0) & (nx < dims[0]) & (ny >= 0) & (ny < dims[1])
+        nb = np.where(valid, nx * dims[1] + ny, 0)
+        rep = np.where(valid, count[nb], 0)
+        i = np.repeat(np.arange(n), rep)
+        offset = np.arange(len(i)) - np.repeat(np.cumsum(rep) - rep, rep)
+        j = order[np.repeat(start[nb], rep) + offset]
+        if (dx, dy) == (0, 0):
+            keep = i < j    #W tej samej komórce każda para raz
+            i, j = i[keep], j[keep]
+        d = pos[j] - pos[i]
+        if periodic:
+            d = minimum_image(d, size)
+        hit = np.einsum('ij,ij->i', d, d) <= (radius[i] + radius[j]) ** 2
+        found_i.append(i[hit])
+        found_j.append(j[hit])
+
+    i, j = np.concatenate(found_i), np.concatenate(found_j)
+    i, j = np.minimum(i, j), np.maximum(i, j)
+    if periodic:    #Przy 1-2 komórkach w osi zawinięte otoczenie powtarza komórki
+        keep = i < j
+        key = np.unique(i[keep] * n + j[keep])
+        return key // n, key % n
+    order = np.lexsort((j, i))
+    return i[order], j[order]
+
+def minimum_image(d, size):     #Przesunięcia (M,2) skrócone do najbliższego obrazu w świecie zawiniętym
+    return d - size * np.floor(d / size + 0.5)
+
+def all_pairs(pos, radius, bounds=None, periodic=False):  #To samo przez porównanie wszystkich par (do testów i pomiarów)
+    pos = np.asarray(pos, dtype=float)
+    radius = np.broadcast_to(np.asarray(radius, dtype=float), (len(pos),))
+    i, j = np.triu_indices(len(pos), 1)
+    d = pos[j] - pos[i]
+    if periodic:
+        d = minimum_image(d, np.broadcast_to(np.asarray(bounds, dtype=float), (2,)))
+    hit = np.einsum('ij,ij->i', d, d) <= (radius[i] + radius[j]) ** 2
+    return i[hit], j[hit]
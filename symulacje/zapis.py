@@ -0,0 +1,140 @@
+#Zapis przebiegu symulacji do pliku binarnego i odczyt przez mapowanie pamięci.
+#Układ pliku: MAGIC, długość nagłówka (uint32), nagłówek JSON, dane stałe (np. promienie), klatki;
+#dane stałe i klatki wyrównane do ALIGN bajtów.
+#Klatki mają stały rozmiar (rekord numpy z polem time), więc klatka k leży pod data_offset + k * itemsize -
+#indeks wynika z numeru klatki, a liczba klatek z rozmiaru pliku (przerwany zapis zostaje czytelny).
+import json
+import numpy as np
+
+MAGIC = b'SYMZAPIS'
+VERSION = 1
+ALIGN = 64
+
+def _aligned(offset):
+    return -(-offset // ALIGN) * ALIGN
+
+def _frame_dtype(fields):   #fields: {nazwa: (dtype, kształt)} -> rekord jednej klatki
+    return np.dtype([('time', '<f8')] + [(name, np.dtype(dtype).str, tuple(shape))
+                                         for name, (dtype, shape) in fields.items()])
+
+class TrajectoryRecorder:
+    #Dopisuje klatki paczkami po chunk - w pamięci jest najwyżej jedna paczka, nie cała historia
+    def __init__(self, path, fields, static=None, meta=None, chunk=64):
+        self.path = path
+        self.dtype = _frame_dtype(fields)
+        self.buffer = np.zeros(chunk, dtype=self.dtype)
+        self.filled = 0
+        self.frames = 0
+        static = {name: np.ascontiguousarray(value) for name, value in (static or {}).items()}
+
+        #Przesunięcia danych stałych i klatek liczone od końca nagłówka (wyrównanego do ALIGN)
+        layout, offset = [], 0
+        for name, value in static.items():
+            layout.append([name, value.dtype.str, list(value.shape), offset])
+            offset = _aligned(offset + value.nbytes)
+        header = dict(version=VERSION, meta=meta or {}, static=layout, data_offset=offset,
+                      fields=[[name, np.dtype(dtype).str, list(shape)] for name, (dtype, shape) in fields.items()])
+        text = json.dumps(header).encode()
+        base = _aligned(len(MAGIC) + 4 + len(text))
+
+        self.file = open(path, 'wb')
+        self.file.write(MAGIC + np.uint32(len(text)).tobytes() + text)
+        for (name, dtype, shape, offset), value in zip(layout, static.values()):
+            self.file.seek(base + offset)
+            self.file.write(value.tobytes())
+        self.file.seek(base + header['data_offset'])
+        self.file.truncate()
+
+    def append(self, time, **values):   #Jedna klatka: pola jak w fields, brakujące zostają zerami
+        frame = self.buffer[self.filled]
+        frame['time'] = time
+        for name, value in values.items():
+            frame[name] = value
+        self.filled += 1
+        self.frames += 1
+        if self.filled == len(self.buffer):
+            self.flush()
+
+    def flush(self):
+        if self.filled:
+            self.buffer[:self.filled].tofile(self.file)
+            self.buffer[:self.filled] = 0
+            self.filled = 0
+        self.file.flush()
+
+    def close(self):
+        if not self.file.closed:
+            self.flush()
+            self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TrajectoryReader:
+    #Klatki jako np.memmap - indeksowanie, wycinki z krokiem i pola bez wczytywania całego pliku
+    def __init__(self, path):
+        self.path = path
+        with open(path, 'rb') as f:
+            if f.read(len(MAGIC)) != MAGIC:
+                raise ValueError(f'{path}: to nie jest plik zapisu symulacji')
+            length = int(np.frombuffer(f.read(4), dtype=np.uint32)[0])
+            header = json.loads(f.read(length))
+        base = _aligned(len(MAGIC) + 4 + length)
+        if header['version'] != VERSION:
+            raise ValueError(f"{path}: nieobsługiwana wersja {header['version']}")
+        self.meta = header['meta']
+        self.dtype = _frame_dtype({name: (dtype, shape) for name, dtype, shape in header['fields']})
+        self.static = {name: np.memmap(path, dtype=dtype, mode='r', offset=base + offset, shape=tuple(shape))
+                       for name, dtype, shape, offset in header['static']}
+        offset = base + header['data_offset']
+        with open(path, 'rb') as f:
+            size = f.seek(0, 2)
+        count = (size - offset) // self.dtype.itemsize  #Niepełna ostatnia klatka pomijana
+        self.frames = (np.memmap(path, dtype=self.dtype, mode='r', offset=offset, shape=(count,))
+                       if count else np.zeros(0, dtype=self.dtype))
+
+    def __len__(self):
+        return len(self.frames)
+
+    def __getitem__(self, index):   #Klatka albo wycinek (np. [::10] - co dziesiąta) jako widok
+        return self.frames[index]
+
+    @property
+    def fields(self):
+        return self.dtype.names[1:]
+
+    @property
+    def times(self):
+        return self.frames['time']
+
+    def field(self, name, start=None, stop=None, step=None):     #(klatki, ...) jednego pola, widok
+        return self.frames[name][start:stop:step]
+
+    def chunks(self, size=1024, step=1):    #Kolejne paczki klatek do przetwarzania strumieniowego
+        for start in range(0, len(self), size * step):
+            yield self.frames[start:start + size * step:step]
+
+class Replay:
+    #Odtwarzanie zamiast fizyki: step(h) przechodzi do następnej klatki, state() jak w scenach
+    def __init__(self, reader, field='pos', every=1):
+        self.reader = reader
+        self.field = field
+        self.every = every  #Decymacja: co która klatka
+        self.index = 0
+
+    @property
+    def done(self):
+        return self.index + self.every >= len(self.reader)
+
+    def step(self, h):
+        if not self.done:
+            self.index += self.every
+
+    def frame(self):
+        return self.reader[self.index]
+
+    def state(self):
+        return np.asarray(self.reader[self.index][self.field])